@@ -88,6 +88,7 @@ engine = create_engine(
     pool_pre_ping=True,  # Verify connections before using
     pool_size=10,
     max_overflow=20,
+    pool_recycle=1800,  # Recycle before idle timeouts on proxies/PgBouncer kill sockets
     echo=False  # Set to True for SQL query logging
 )
 
@@ -6,7 +6,7 @@ Fetches accounts, transactions, and balances from the Enable Banking REST API.
 
 import hashlib
 import logging
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from decimal import Decimal
 from datetime import datetime, timezone
 
@@ -86,14 +86,19 @@ class EnableBankingAdapter(BankAdapter):
             ))
         return accounts
 
-    def fetch_transactions(
+    def iter_transactions(
         self,
         account_external_id: str,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-    ) -> List[TransactionData]:
-        """Fetch transactions with pagination via continuation_key."""
-        all_transactions: List[TransactionData] = []
+    ) -> Iterator[TransactionData]:
+        """
+        Yield normalized transactions page by page via continuation_key.
+
+        Streaming consumers (large first-time backfills) hold one page in
+        memory at a time and can start DB work while later pages are
+        still in flight, instead of waiting on the full history.
+        """
         params: dict = {}
         if start_date:
             params["date_from"] = start_date.strftime("%Y-%m-%d")
@@ -115,7 +120,7 @@ class EnableBankingAdapter(BankAdapter):
             data = resp.json()
 
             for txn in data.get("transactions", []):
-                all_transactions.append(self.normalize_transaction(txn))
+                yield self.normalize_transaction(txn)
 
             continuation_key = data.get("continuation_key")
             if not continuation_key:
@@ -126,7 +131,18 @@ class EnableBankingAdapter(BankAdapter):
                 f"aborting to avoid partial sync"
             )
 
-        return all_transactions
+    def fetch_transactions(
+        self,
+        account_external_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> List[TransactionData]:
+        """Fetch transactions with pagination via continuation_key."""
+        return list(
+            self.iter_transactions(
+                account_external_id, start_date=start_date, end_date=end_date
+            )
+        )
 
     def normalize_transaction(self, raw: dict) -> TransactionData:
         """Map EB transaction to canonical format."""
@@ -75,6 +75,8 @@ class Account(Base):
     # Indexes and constraints
     __table_args__ = (
         Index("idx_accounts_user", "user_id"),
+        # Serves the per-connection account fetch in the sync tasks
+        Index("idx_accounts_bank_connection", "bank_connection_id"),
         UniqueConstraint("user_id", "provider", "external_id", name="accounts_user_provider_external_id"),
         Index(
             "accounts_user_provider_external_id_hash_uq",
@@ -121,6 +123,8 @@ class BankConnection(Base):
     __table_args__ = (
         Index("idx_bank_connections_user", "user_id"),
         Index("idx_bank_connections_status", "status"),
+        # Serves the periodic "active and due for sync" scan
+        Index("idx_bank_connections_status_last_synced", "status", "last_synced_at"),
         Index("idx_bank_connections_consent_expires", "consent_expires_at"),
         UniqueConstraint("user_id", "session_id", name="bank_connections_user_session"),
     )
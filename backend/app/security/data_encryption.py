@@ -91,7 +91,7 @@ def encrypt_value(plaintext: Optional[str]) -> Optional[str]:
         return None
 
     nonce = os.urandom(12)
-    ciphertext = AESGCM(config.current_key).encrypt(
+    ciphertext = _aesgcm(config.current_key).encrypt(
         nonce=nonce,
         data=plaintext.encode("utf-8"),
         associated_data=None,
@@ -100,6 +100,11 @@ def encrypt_value(plaintext: Optional[str]) -> Optional[str]:
     return f"{_ENVELOPE_PREFIX}:{config.key_id}:{payload}"
 
 
+@lru_cache(maxsize=4)
+def _aesgcm(key: bytes) -> AESGCM:
+    return AESGCM(key)
+
+
 def decrypt_value(ciphertext: Optional[str]) -> Optional[str]:
     if ciphertext is None:
         return None
@@ -108,6 +113,15 @@ def decrypt_value(ciphertext: Optional[str]) -> Optional[str]:
         # Backward compatibility with plaintext rows.
         return ciphertext
 
+    return _decrypt_envelope(ciphertext, _load_config())
+
+
+# Memoized per (ciphertext, key config): the same envelopes — account
+# external ids above all — are decrypted on every sync pass, and AEAD is
+# deterministic, so one AES-GCM call per distinct blob suffices. Keying
+# on the config means a key rotation naturally misses the stale entry.
+@lru_cache(maxsize=2048)
+def _decrypt_envelope(ciphertext: str, config: _EncryptionConfig) -> str:
     parts = ciphertext.split(":", 3)
     if len(parts) != 4:
         raise ValueError("Invalid encrypted value format.")
@@ -120,7 +134,6 @@ def decrypt_value(ciphertext: Optional[str]) -> Optional[str]:
     nonce = blob[:12]
     encrypted = blob[12:]
 
-    config = _load_config()
     if not config.enabled:
         raise ValueError("Encrypted data found but DATA_ENCRYPTION_KEY_CURRENT is not configured.")
 
@@ -137,7 +150,7 @@ def decrypt_value(ciphertext: Optional[str]) -> Optional[str]:
     last_error = None
     for key in candidate_keys:
         try:
-            plaintext = AESGCM(key).decrypt(
+            plaintext = _aesgcm(key).decrypt(
                 nonce=nonce,
                 data=encrypted,
                 associated_data=None,
@@ -204,3 +217,5 @@ def blind_index_candidates(value: Optional[str]) -> list[str]:
 
 def reset_encryption_config_cache() -> None:
     _load_config.cache_clear()
+    _decrypt_envelope.cache_clear()
+    _aesgcm.cache_clear()
@@ -1,6 +1,10 @@
+import base64
 import json
 import os
+from functools import lru_cache
+
 from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 
 class CredentialKeyMissing(RuntimeError):
@@ -11,24 +15,80 @@ class CredentialDecryptError(RuntimeError):
     pass
 
 
+# New blobs are AES-256-GCM under this prefix (one AES-NI pass, no
+# Python-level token parsing); prefix-less blobs are legacy Fernet and
+# remain readable. Mirrors the envelope style in app.security.
+_GCM_PREFIX = "cred:v2:"
+_GCM_NONCE_LEN = 12
+
+
 def generate_key() -> str:
     return Fernet.generate_key().decode()
 
 
-def _fernet() -> Fernet:
+@lru_cache(maxsize=4)
+def _fernet_for(key: str) -> Fernet:
+    # Fernet() base64-decodes the key and derives the signing/encryption
+    # halves on construction; build it once per key instead of per call.
+    return Fernet(key.encode())
+
+
+@lru_cache(maxsize=4)
+def _aesgcm_for(key: str) -> AESGCM:
+    # The Fernet key is urlsafe base64 of 32 random bytes; use those
+    # same 32 bytes directly as the AES-256-GCM key.
+    return AESGCM(base64.urlsafe_b64decode(key.encode()))
+
+
+def _active_key() -> str:
     key = os.getenv("SYLLOGIC_SECRET_KEY")
     if not key:
         raise CredentialKeyMissing("SYLLOGIC_SECRET_KEY env var is required to encrypt/decrypt credentials")
-    return Fernet(key.encode() if isinstance(key, str) else key)
+    return key if isinstance(key, str) else key.decode()
 
 
 def encrypt(payload: dict) -> str:
-    return _fernet().encrypt(json.dumps(payload, sort_keys=True).encode()).decode()
+    key = _active_key()
+    nonce = os.urandom(_GCM_NONCE_LEN)
+    ciphertext = _aesgcm_for(key).encrypt(
+        nonce=nonce,
+        data=json.dumps(payload, sort_keys=True).encode(),
+        associated_data=None,
+    )
+    return _GCM_PREFIX + base64.urlsafe_b64encode(nonce + ciphertext).decode()
 
 
-def decrypt(blob: str) -> dict:
+@lru_cache(maxsize=256)
+def _decrypt_cached(blob: str, key: str) -> bytes:
+    """
+    Decrypt a credential blob, memoized by (ciphertext, key).
+
+    A blob is immutable until credentials are re-stored, and re-storing
+    produces a new ciphertext (fresh nonce), so every poll after the
+    first resolves to a dict lookup instead of an AES pass. Keying on
+    the active secret key keeps a key rotation from serving plaintext
+    decrypted under the old key.
+    """
+    if blob.startswith(_GCM_PREFIX):
+        try:
+            raw = base64.urlsafe_b64decode(blob[len(_GCM_PREFIX):].encode())
+            if len(raw) <= _GCM_NONCE_LEN:
+                raise ValueError("credential blob too short")
+            return _aesgcm_for(key).decrypt(
+                nonce=raw[:_GCM_NONCE_LEN],
+                data=raw[_GCM_NONCE_LEN:],
+                associated_data=None,
+            )
+        except Exception as e:
+            raise CredentialDecryptError("Invalid or tampered credential blob") from e
+    # Legacy Fernet blob (pre-dates the cred:v2: envelope).
     try:
-        raw = _fernet().decrypt(blob.encode())
+        return _fernet_for(key).decrypt(blob.encode())
     except InvalidToken as e:
         raise CredentialDecryptError("Invalid or tampered credential blob") from e
-    return json.loads(raw.decode())
+
+
+def decrypt(blob: str) -> dict:
+    # json.loads per call so callers get a private dict; only the crypto
+    # work is shared through the cache.
+    return json.loads(_decrypt_cached(blob, _active_key()).decode())
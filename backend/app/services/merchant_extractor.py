@@ -8,8 +8,33 @@ import re
 from typing import Optional, List, Tuple
 from dataclasses import dataclass
 
+import pandas as pd
 
-@dataclass
+# Bloom-filter prefilter over 3-grams of the known merchant keys. Most
+# descriptions contain no known merchant at all; a cheap bitset probe per
+# 3-gram lets us skip the full regex scan for those.
+_BLOOM_MASK = 2047  # 2048-bit filter
+
+
+def _hash3(gram: str) -> int:
+    """FNV-1a hash of a short string (used for 3-grams)."""
+    h = 2166136261
+    for ch in gram:
+        h ^= ord(ch)
+        h = (h * 16777619) & 0xFFFFFFFF
+    return h
+
+
+def _build_bloom(keys) -> int:
+    """OR together the bits for every 3-gram of every key."""
+    bloom = 0
+    for key in keys:
+        for i in range(len(key) - 2):
+            bloom |= 1 << (_hash3(key[i:i + 3]) & _BLOOM_MASK)
+    return bloom
+
+
+@dataclass(slots=True, frozen=True)
 class MerchantExtractionResult:
     """Result of merchant extraction."""
     merchant: Optional[str]
@@ -220,6 +245,10 @@ class MerchantExtractor:
         r'\bcorp\b',
     ]
 
+    # Shortest known-merchant key; descriptions shorter than this cannot
+    # contain any known merchant, so extract() skips the scan entirely.
+    _MIN_KEY_LEN = min(len(k.strip()) for k in KNOWN_MERCHANTS)
+
     # Date patterns to strip
     DATE_PATTERNS = [
         r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b',  # DD/MM/YYYY or similar
@@ -229,14 +258,23 @@ class MerchantExtractor:
     ]
 
     def __init__(self):
-        # Compile regex patterns for performance
-        self._noise_pattern = re.compile(
-            '|'.join(self.NOISE_PATTERNS),
-            re.IGNORECASE
-        )
-        self._date_pattern = re.compile(
-            '|'.join(self.DATE_PATTERNS)
-        )
+        # All derived lookup structures are compiled once at import (see
+        # module bottom): extract_merchant() instantiates a fresh extractor
+        # per call, so per-instance compilation would land on hot paths.
+        self._noise_pattern: re.Pattern[str] = _NOISE_RE
+        self._date_pattern: re.Pattern[str] = _DATE_RE
+        self._known_keys: List[str] = _KNOWN_KEYS
+        self._specific_alternation: re.Pattern[str] = _SPECIFIC_RE
+        self._processor_alternation: re.Pattern[str] = _PROCESSOR_RE
+        self._known_lookup: dict = _KNOWN_LOOKUP
+        self._single_token: dict = _SINGLE_TOKEN
+        self._bloom: int = _BLOOM
+        self._short_keys: List[str] = _SHORT_KEYS
+
+    @staticmethod
+    def _build_alternation(keys) -> str:
+        """Join merchant keys into a single word-bounded alternation."""
+        return r'\b(' + '|'.join(re.escape(k.strip()) for k in keys) + r')\b'
 
     def _clean_description(self, description: str) -> str:
         """
@@ -251,20 +289,52 @@ class MerchantExtractor:
         if not description:
             return ""
 
+        # Fast path: clean export formats often contain no noise at all,
+        # so a search (no allocation) beats three substitution passes.
+        if (not self._date_pattern.search(description)
+                and not self._noise_pattern.search(description)):
+            return ' '.join(description.split())
+
         # Remove date patterns
         cleaned = self._date_pattern.sub(' ', description)
 
         # Remove noise patterns
         cleaned = self._noise_pattern.sub(' ', cleaned)
 
-        # Remove extra whitespace
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-
-        return cleaned
+        # Remove extra whitespace (split/join also drops leading/trailing)
+        return ' '.join(cleaned.split())
 
     # Payment processors - we should look for the actual merchant after these
     PAYMENT_PROCESSORS = {'mollie', 'stripe', 'paypal', 'adyen', 'worldpay', 'buckaroo'}
 
+    # Merchant hits are Zipfian: a handful of brands account for most of
+    # them. These get a plain substring check (C-level memmem, far cheaper
+    # than regex) before the general path. Only keys that are unambiguous
+    # as substrings belong here -- nothing that is a prefix of a longer
+    # key with a different canonical name, and no payment processors.
+    _HOT_MERCHANTS: List[Tuple[str, str]] = [
+        ('netflix', 'Netflix'),
+        ('spotify', 'Spotify'),
+        # Note 'disney' itself doesn't qualify: it is a substring of
+        # "disneyland", which must not resolve to Disney+. The bare word
+        # still matches via the boundary-aware token/regex paths below.
+        ('disney+', 'Disney+'),
+        ('disneyplus', 'Disney+'),
+        ('deliveroo', 'Deliveroo'),
+        ('thuisbezorgd', 'Thuisbezorgd'),
+        ('zalando', 'Zalando'),
+        ('bol.com', 'Bol.com'),
+        ('coolblue', 'Coolblue'),
+        ('vodafone', 'Vodafone'),
+        ('ziggo', 'Ziggo'),
+        ('vattenfall', 'Vattenfall'),
+        ('eneco', 'Eneco'),
+        ('rabobank', 'Rabobank'),
+        ('revolut', 'Revolut'),
+        ('basic-fit', 'Basic-Fit'),
+        ('swapfiets', 'Swapfiets'),
+    ]
+
     def _find_known_merchant(self, text: str) -> Optional[str]:
         """
         Check if text contains a known merchant name.
@@ -277,23 +347,58 @@ class MerchantExtractor:
         """
         text_lower = text.lower()
 
-        # First pass: look for specific merchants (not payment processors)
-        # This ensures "Mollie VOLT45" matches VOLT45 instead of Mollie
-        for pattern, canonical_name in self.KNOWN_MERCHANTS.items():
-            # Skip payment processors on first pass
-            if pattern.lower() in self.PAYMENT_PROCESSORS:
+        # Hottest path: the top brands by hit frequency, via substring
+        # containment only (no regex, no tokenization).
+        for needle, canonical in self._HOT_MERCHANTS:
+            if needle in text_lower:
+                return canonical
+
+        # Fast path: most merchants appear as a literal whitespace token
+        # ("netflix"), so a dict probe per token finds them without any
+        # regex work. Payment processors are remembered but deferred so a
+        # specific merchant elsewhere in the text still wins.
+        processor_hit: Optional[str] = None
+        for token in text_lower.split():
+            canonical = self._single_token.get(token)
+            if canonical is None:
                 continue
+            if token in _MULTI_KEY_WORDS:
+                # The token is part of a longer multi-word key ("uber
+                # eats", "anytime fitness"); let the longest-first regex
+                # pass decide.
+                continue
+            if token in self.PAYMENT_PROCESSORS:
+                if processor_hit is None:
+                    processor_hit = canonical
+            else:
+                return canonical
+
+        # Prefilter: if no 3-gram of the text is in the bloom filter, no
+        # key can match and the regex scans below are wasted work. Short
+        # keys (< 3 chars) bypass the filter via a plain substring check.
+        bloom = self._bloom
+        if not any(
+            (bloom >> (_hash3(text_lower[i:i + 3]) & _BLOOM_MASK)) & 1
+            for i in range(len(text_lower) - 2)
+        ):
+            if not any(key in text_lower for key in self._short_keys):
+                return processor_hit
 
+        # First pass: look for specific merchants (not payment processors)
+        # This ensures "Mollie VOLT45" matches VOLT45 instead of Mollie.
+        # Patterns are escaped and compiled once at import, longest key
+        # first so "uber eats" wins over "uber".
+        for pattern, canonical_name in _SPECIFIC_KEY_PATTERNS:
             # Check for word boundary matches to avoid false positives
-            if re.search(rf'\b{re.escape(pattern)}\b', text_lower):
+            if pattern.search(text_lower):
                 return canonical_name
 
         # Second pass: if no specific merchant found, accept payment processors
-        for pattern, canonical_name in self.KNOWN_MERCHANTS.items():
-            if pattern.lower() not in self.PAYMENT_PROCESSORS:
-                continue
+        if processor_hit is not None:
+            return processor_hit
 
-            if re.search(rf'\b{re.escape(pattern)}\b', text_lower):
+        for pattern, canonical_name in _PROCESSOR_KEY_PATTERNS:
+            if pattern.search(text_lower):
                 return canonical_name
 
         return None
@@ -370,8 +475,11 @@ class MerchantExtractor:
                 method='none'
             )
 
-        # 1. Check for known merchant patterns
-        known_merchant = self._find_known_merchant(description)
+        # 1. Check for known merchant patterns (skipped when the text is
+        # too short to contain even the shortest key)
+        known_merchant = None
+        if len(description) >= self._MIN_KEY_LEN:
+            known_merchant = self._find_known_merchant(description)
         if known_merchant:
             return MerchantExtractionResult(
                 merchant=known_merchant,
@@ -410,6 +518,120 @@ class MerchantExtractor:
             method='none'
         )
 
+    def extract_series(self, descriptions: "pd.Series") -> "pd.Series":
+        """
+        Vectorized merchant extraction for a whole Series of descriptions.
+
+        Used by CSV/Excel import paths that already hold descriptions in a
+        DataFrame column. Known-merchant matching runs through pandas'
+        string kernels in one pass over the column; only rows without a
+        known-merchant hit fall back to the per-element extract() path.
+
+        Args:
+            descriptions: Series of raw transaction descriptions
+
+        Returns:
+            Series of extracted merchant names (None where nothing found),
+            aligned with the input index.
+        """
+        if descriptions.empty:
+            return pd.Series([], index=descriptions.index, dtype=object)
+
+        try:
+            # Arrow-backed strings keep the .str ops in Arrow's UTF-8 kernels
+            s = descriptions.astype(pd.StringDtype("pyarrow"))
+        except (ImportError, TypeError):
+            s = descriptions.astype("string")
+
+        lowered = s.str.lower()
+        hits = lowered.str.extract(self._specific_alternation, expand=False)
+        processor_hits = lowered.str.extract(self._processor_alternation, expand=False)
+        result = hits.fillna(processor_hits).map(self._known_lookup)
+
+        # Fall back to the scalar path for rows with no known-merchant hit
+        misses = result.isna() & descriptions.notna()
+        if misses.any():
+            result[misses] = descriptions[misses].apply(
+                lambda d: self.extract(d).merchant
+            )
+
+        return result.astype(object).where(result.notna(), None)
+
+
+# Derived lookup structures, compiled once per process at import time.
+# All patterns and merchant keys are ASCII, so re.ASCII keeps \b and
+# IGNORECASE on CPython's ASCII fast path instead of the full Unicode
+# property tables.
+_NOISE_RE = re.compile(
+    '|'.join(MerchantExtractor.NOISE_PATTERNS),
+    re.IGNORECASE | re.ASCII
+)
+_DATE_RE = re.compile('|'.join(MerchantExtractor.DATE_PATTERNS), re.ASCII)
+
+# Known merchant keys, longest first so "uber eats" wins over "uber" in
+# the alternations. Two alternations mirror the two passes in
+# _find_known_merchant: specific merchants first, payment processors only
+# as a fallback (so "Mollie VOLT45" resolves to VOLT45, not Mollie).
+_KNOWN_KEYS = sorted(MerchantExtractor.KNOWN_MERCHANTS, key=len, reverse=True)
+_SPECIFIC_RE = re.compile(
+    MerchantExtractor._build_alternation(
+        k for k in _KNOWN_KEYS
+        if k.lower() not in MerchantExtractor.PAYMENT_PROCESSORS
+    ),
+    re.ASCII
+)
+_PROCESSOR_RE = re.compile(
+    MerchantExtractor._build_alternation(
+        k for k in _KNOWN_KEYS
+        if k.lower() in MerchantExtractor.PAYMENT_PROCESSORS
+    ),
+    re.ASCII
+)
+
+# Keys as they come out of the alternation (stripped of the padding some
+# entries use, e.g. 'ns ') -> canonical name.
+_KNOWN_LOOKUP = {k.strip(): v for k, v in MerchantExtractor.KNOWN_MERCHANTS.items()}
+
+# Single-token keys ("netflix", "bol.com") can be matched with one dict
+# lookup per whitespace token -- no regex scan needed. Keys containing
+# spaces still go through the word-boundary regex path.
+_SINGLE_TOKEN = {
+    k.strip(): v for k, v in MerchantExtractor.KNOWN_MERCHANTS.items()
+    if ' ' not in k.strip()
+}
+
+_BLOOM = _build_bloom(k.strip().lower() for k in MerchantExtractor.KNOWN_MERCHANTS)
+
+# Keys too short to have a 3-gram can't go through the bloom filter
+_SHORT_KEYS = [
+    k.strip() for k in MerchantExtractor.KNOWN_MERCHANTS if len(k.strip()) < 3
+]
+
+# Per-key patterns for the scalar scan, escaped and compiled once here so
+# _find_known_merchant pays no re.escape/re.compile cost per call. Longest
+# key first, matching the alternation ordering above.
+_SPECIFIC_KEY_PATTERNS = [
+    (re.compile(rf'\b{re.escape(k)}\b', re.ASCII), MerchantExtractor.KNOWN_MERCHANTS[k])
+    for k in _KNOWN_KEYS
+    if k.lower() not in MerchantExtractor.PAYMENT_PROCESSORS
+]
+_PROCESSOR_KEY_PATTERNS = [
+    (re.compile(rf'\b{re.escape(k)}\b', re.ASCII), MerchantExtractor.KNOWN_MERCHANTS[k])
+    for k in _KNOWN_KEYS
+    if k.lower() in MerchantExtractor.PAYMENT_PROCESSORS
+]
+
+# Every word of every multi-word key; the single-token fast path defers
+# to the longest-first regex pass when a token appears anywhere in a
+# longer key ("uber" starts "uber eats", "fitness" ends "anytime
+# fitness"), so standalone keys never shadow a longer match.
+_MULTI_KEY_WORDS = frozenset(
+    word
+    for k in MerchantExtractor.KNOWN_MERCHANTS
+    if ' ' in k.strip()
+    for word in k.strip().split()
+)
+
 
 def extract_merchant(
     description: Optional[str],
@@ -12,21 +12,27 @@ Usage:
 import os
 import re
 import json
+import math
 import logging
-from typing import Optional, List, Dict, Tuple, Set
+from bisect import bisect_right
+from typing import Any, Optional, List, Dict, Tuple, Set, Sequence
 from decimal import Decimal
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from uuid import UUID
 
+import numpy as np
+import pandas as pd
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from app.models import Transaction, RecurringTransaction, SubscriptionSuggestion
 from app.db_helpers import get_user_id
 from app.services.text_similarity import TextSimilarity
-from app.services.merchant_extractor import MerchantExtractor
+from app.services.merchant_extractor import MerchantExtractor, MerchantExtractionResult
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +49,19 @@ MIN_TRANSACTIONS = int(os.getenv("SUBSCRIPTION_SUGGESTION_MIN_TRANSACTIONS", "2"
 # Text similarity threshold for grouping (high = strict matching)
 TEXT_SIMILARITY_THRESHOLD = 0.65  # 65% similarity to be considered same subscription
 
+# Minimum share of the smaller description's character trigrams that two
+# descriptions must have in common before full similarity scoring runs;
+# containment (not plain Jaccard) so short-name-in-long-description
+# substring matches are never blocked.
+TRIGRAM_BLOCK_OVERLAP = 0.3
+
+# Largest fingerprint group that still gets the pairwise similarity scan
+# when whole-group analysis fails; beyond this the scan is quadratic in
+# group size for groups that rarely yield a pattern anyway.
+MAX_SIMILARITY_SCAN_GROUP = int(
+    os.getenv("SUBSCRIPTION_SUGGESTION_MAX_SCAN_GROUP", "50")
+)
+
 # Amount can vary by up to 30% and still be considered the same subscription
 AMOUNT_TOLERANCE_PERCENT = 0.30
 
@@ -77,8 +96,190 @@ P2P_PATTERNS = [
     r'naam:\s*[A-Z][a-z]+\s+[A-Z][a-z]+\s*$',  # Just a name, nothing else
 ]
 
+# All patterns are compiled once at import; detect_patterns applies them to
+# every transaction (and some to every pair), so per-call re-cache lookups
+# add up quickly.
+_P2P_RES = tuple(re.compile(p, re.IGNORECASE) for p in P2P_PATTERNS)
+
+# CSID pattern (NLxxZZZxxxxxxxxx) - SEPA Direct Debit creditor.
+# CSIDs can be 15-18 digits after the ZZZ.
+_CSID_RE = re.compile(r'\b(NL\d{2}ZZZ\d{9,18})\b', re.IGNORECASE)
+
+# IBAN in context of transfers: IBAN/NLxx... or IBAN: NLxx...
+_IBAN_RE = re.compile(r'IBAN[/: ]*([A-Z]{2}\d{2}[A-Z]{4}\d{10})\b', re.IGNORECASE)
+
+# Bare IBAN (personal-transfer heuristics)
+_PERSONAL_IBAN_RE = re.compile(r'\b([A-Z]{2}\d{2}[A-Z]{4}\d{10})\b', re.IGNORECASE)
+_PERSONAL_INDICATOR_RES = (
+    re.compile(r'\b(naar|van|to|from)\s+[A-Z][a-z]+\b', re.IGNORECASE),  # "naar John"
+    re.compile(r'\bnaam:\s*[A-Z]', re.IGNORECASE),  # "Naam: J..."
+)
+
+# Noise removed from descriptions before comparison
+# (but NOT CSID/IBAN - those are handled separately). Fused into
+# alternations so normalization makes a couple of passes over the text
+# instead of one per pattern; all patterns substitute a space, so
+# ordering between them carries no semantics. Patterns that cannot match
+# without a digit are kept separate so digit-free descriptions (the
+# common case after lowercasing a short merchant line) skip them via a
+# cheap isdigit() scan.
+_NOISE_NUMERIC_PATTERNS = [
+    r'\b\d{8,}\b',  # Very long numbers only (8+ digits)
+    r'\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}',  # Dates (DD/MM/YYYY)
+    r'\d{4}[-/.]\d{1,2}[-/.]\d{1,2}',  # ISO dates (YYYY-MM-DD)
+    r'\b\d{2}[-/]\d{4}\b',  # Month-year (01-2025)
+    r'pas\d{3}',  # Card number suffix (PAS000)
+]
+
+_NOISE_ALPHA_PATTERNS = [
+    r'\b(ref|nr|no|number|kenmerk|factnr|factuur|invoice)[.:# ]*\w*',  # Reference labels
+    r'\b(btw|vat|tax)[.:# ]*\d*%?\b',  # Tax references
+    r'\b(periode|period|termijn)[.:# ]*\w*\b',  # Period references
+    r'\b(bv|nv|ltd|inc|gmbh|llc|co|corp)\b\.?',  # Company suffixes
+    r'\bb\.v\.?\b|\bn\.v\.?\b',  # Dutch company suffixes with dots
+    r'[%€$£]',  # Currency/percentage symbols
+    r'/trtp/',  # Transaction type prefix
+    r'/csid/',  # CSID prefix (we extract the ID separately)
+    r'/iban/',  # IBAN prefix
+    r'/bic/',  # BIC prefix
+    r'/naam/',  # Name prefix
+]
 
-@dataclass
+_NOISE_NUMERIC_RE = re.compile(
+    '|'.join(f'(?:{p})' for p in _NOISE_NUMERIC_PATTERNS),
+    re.IGNORECASE
+)
+_NOISE_ALPHA_RE = re.compile(
+    '|'.join(f'(?:{p})' for p in _NOISE_ALPHA_PATTERNS),
+    re.IGNORECASE
+)
+
+_WS_RE = re.compile(r'\s+')
+
+# Sentinel distinguishing "not cached" from a cached None
+_CACHE_MISS = object()
+
+# Name extraction from SEPA transfer descriptions
+_NAAM_RE = re.compile(r'Naam:\s*([^\s/][^/\n]{2,})', re.IGNORECASE)
+_SLASH_NAME_RE = re.compile(r'/NAME/([^/]+)', re.IGNORECASE)
+_SEPA_PREFIX_RE = re.compile(
+    r'^(sepa\s+)?(incasso\s+)?(algemeen\s+)?(doorlopend\s+)?', re.IGNORECASE
+)
+
+def _normalize_description_text(text: str) -> str:
+    """Uncached core of description normalization (hot per-transaction path)."""
+    normalized = text.lower().strip()
+    if any(ch.isdigit() for ch in normalized):
+        normalized = _NOISE_NUMERIC_RE.sub(' ', normalized)
+    normalized = _NOISE_ALPHA_RE.sub(' ', normalized)
+
+    # Remove extra whitespace and trim
+    return _WS_RE.sub(' ', normalized).strip()
+
+
+def _extract_csid_text(text: str) -> Optional[str]:
+    """Uncached core of CSID/IBAN extraction (hot per-transaction path)."""
+    csid_match = _CSID_RE.search(text)
+    if csid_match:
+        return csid_match.group(1).upper()
+
+    # Look for IBAN in context of transfers (for recurring transfers)
+    # Pattern: IBAN/NLxxAAAAxxxxxxxxxx or IBAN: NLxxAAAAxxxxxxxxxx
+    iban_match = _IBAN_RE.search(text)
+    if iban_match:
+        return iban_match.group(1).upper()
+    return None
+
+
+# A compiled drop-in (e.g. a cythonized build of the two functions
+# above) can be installed alongside the app; prefer it when present.
+try:
+    from app.services.subscription_detector_fast import (  # type: ignore
+        normalize_description_text as _normalize_description_text,
+        extract_csid_text as _extract_csid_text,
+    )
+except ImportError:  # pragma: no cover - compiled module is optional
+    pass
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba is an optional accelerator
+    njit = None
+
+
+def _interval_stats(intervals: np.ndarray) -> Tuple[float, float]:
+    """Mean and population std of a non-empty int64 interval array."""
+    n = intervals.size
+    total = 0.0
+    for i in range(n):
+        total += intervals[i]
+    mean = total / n
+    var = 0.0
+    for i in range(n):
+        diff = intervals[i] - mean
+        var += diff * diff
+    return mean, (var / n) ** 0.5
+
+
+def _amount_cluster_ids(amts: np.ndarray, tol: float) -> np.ndarray:
+    """
+    Assign a cluster id to each element of an ascending float64 array.
+
+    An element joins the current cluster while it stays within ``tol``
+    relative distance of the cluster's running mean; otherwise it opens
+    a new cluster. Ids are contiguous starting at 0.
+    """
+    n = amts.size
+    ids = np.empty(n, dtype=np.int64)
+    if n == 0:
+        return ids
+    ids[0] = 0
+    cluster_id = 0
+    cluster_sum = amts[0]
+    cluster_len = 1
+    for i in range(1, n):
+        amt = amts[i]
+        cluster_avg = cluster_sum / cluster_len
+        bound = amt if amt > cluster_avg else cluster_avg
+        if bound == 0.0 or abs(amt - cluster_avg) / bound <= tol:
+            ids[i] = cluster_id
+            cluster_sum += amt
+            cluster_len += 1
+        else:
+            cluster_id += 1
+            ids[i] = cluster_id
+            cluster_sum = amt
+            cluster_len = 1
+    return ids
+
+
+def _amount_stats(amounts: np.ndarray) -> Tuple[float, float]:
+    """Mean and coefficient of variation of a non-empty float64 array."""
+    n = amounts.size
+    total = 0.0
+    for i in range(n):
+        total += amounts[i]
+    mean = total / n
+    if n < 2 or mean <= 0.0:
+        return mean, 0.0
+    var = 0.0
+    for i in range(n):
+        d = amounts[i] - mean
+        var += d * d
+    return mean, (var / n) ** 0.5 / mean
+
+
+if njit is not None:
+    _interval_stats = njit(cache=True)(_interval_stats)
+    _amount_cluster_ids = njit(cache=True)(_amount_cluster_ids)
+    _amount_stats = njit(cache=True)(_amount_stats)
+    # Warm the kernels so the first detection run doesn't pay JIT cost.
+    _interval_stats(np.array([30, 31], dtype=np.int64))
+    _amount_cluster_ids(np.array([9.99, 10.01], dtype=np.float64), 0.20)
+    _amount_stats(np.array([9.99, 10.01], dtype=np.float64))
+
+
+@dataclass(slots=True)
 class DetectedPattern:
     """A detected recurring payment pattern."""
     account_id: str
@@ -88,13 +289,35 @@ class DetectedPattern:
     currency: str
     detected_frequency: str
     confidence: int  # 0-100
-    matched_transaction_ids: List[str] = field(default_factory=list)
+    matched_transaction_ids: Tuple[str, ...] = ()
     match_count: int = 0
     avg_interval_days: float = 0.0
     category_id: Optional[str] = None
     latest_transaction_at: Optional[datetime] = None
 
 
+@dataclass(slots=True)
+class _TxnRow:
+    """
+    Lightweight stand-in for a Transaction during pattern detection.
+
+    detect_patterns streams plain column rows instead of hydrating full
+    ORM entities; this carries just the fields the detection pipeline
+    reads, plus the precomputed hot-path values.
+    """
+    id: Any
+    account_id: Any
+    description: Optional[str]
+    merchant: Optional[str]
+    amount: Decimal
+    currency: Optional[str]
+    booked_at: Optional[datetime]
+    category_id: Any
+    category_system_id: Any
+    _abs_amt: float
+    _sid: str
+
+
 class SubscriptionDetector:
     """
     Detects recurring payment patterns from transactions.
@@ -130,6 +353,9 @@ class SubscriptionDetector:
     }
 
     # Named frequency ranges (for labeling detected patterns)
+    # Sorted prefix keys for the bisect lookup in _get_merchant_from_creditor_id
+    _SORTED_CREDITOR_PREFIXES = sorted(KNOWN_CREDITOR_PREFIXES)
+
     FREQUENCY_LABELS = {
         'weekly': (5, 9),
         'biweekly': (12, 18),
@@ -147,6 +373,28 @@ class SubscriptionDetector:
         self.text_similarity = TextSimilarity()
         self.merchant_extractor = MerchantExtractor()
         self._existing_subscriptions: Optional[List[RecurringTransaction]] = None
+        self._existing_by_amt_bucket: Dict[Optional[int], List[RecurringTransaction]] = defaultdict(list)
+        # Per-description memoization: the similarity loop revisits the
+        # same description strings O(N^2) times during detection.
+        self._norm_cache: Dict[str, str] = {}
+        self._csid_cache: Dict[str, Optional[str]] = {}
+        # Fingerprinting, group analysis and naming each re-extract the
+        # same (description, merchant) pairs; keyed cache avoids that.
+        self._merchant_cache: Dict[Tuple[str, str], MerchantExtractionResult] = {}
+        self._fp_cache: Dict[str, str] = {}
+        self._tri_cache: Dict[str, frozenset] = {}
+
+    def _extract_merchant(
+        self, description: Optional[str], merchant: Optional[str]
+    ) -> MerchantExtractionResult:
+        """Memoized wrapper around MerchantExtractor.extract()."""
+        key = (description or '', merchant or '')
+        hit = self._merchant_cache.get(key)
+        if hit is not None:
+            return hit
+        result = self.merchant_extractor.extract(description, merchant)
+        self._merchant_cache[key] = result
+        return result
 
     def _load_existing_subscriptions(self) -> List[RecurringTransaction]:
         """Load and cache active subscriptions for the user."""
@@ -155,8 +403,30 @@ class SubscriptionDetector:
                 RecurringTransaction.user_id == self.user_id,
                 RecurringTransaction.is_active == True
             ).all()
+            # Index by amount bucket so _matches_existing_subscription
+            # scans a few buckets instead of every subscription. Legacy
+            # account-agnostic entries are skipped there, so they are
+            # not indexed either.
+            for sub in self._existing_subscriptions:
+                if sub.account_id:
+                    bucket = self._amount_bucket(abs(float(sub.amount)))
+                    self._existing_by_amt_bucket[bucket].append(sub)
         return self._existing_subscriptions
 
+    @staticmethod
+    def _amount_bucket(amount: float) -> Optional[int]:
+        """
+        25%-wide logarithmic amount bucket.
+
+        The 20%-of-average tolerance band used when matching always fits
+        within one neighboring bucket on each side, so lookups scan at
+        most three buckets. Non-positive amounts (which bypass the
+        amount check entirely) live in the ``None`` bucket.
+        """
+        if amount <= 0:
+            return None
+        return int(math.floor(math.log(amount, 1.25)))
+
     @staticmethod
     def _to_uuid(value: Optional[str]) -> Optional[UUID]:
         """Safely parse a UUID-like string."""
@@ -177,8 +447,8 @@ class SubscriptionDetector:
         text = (txn.description or "") + " " + (txn.merchant or "")
 
         # Check against P2P patterns
-        for pattern in P2P_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
+        for pattern in _P2P_RES:
+            if pattern.search(text):
                 return True
 
         # Check for personal IBANs without SEPA Creditor ID
@@ -190,15 +460,11 @@ class SubscriptionDetector:
             return False
 
         # Check for IBAN without CSID - could be personal transfer
-        iban_match = re.search(r'\b([A-Z]{2}\d{2}[A-Z]{4}\d{10})\b', text, re.IGNORECASE)
+        iban_match = _PERSONAL_IBAN_RE.search(text)
         if iban_match:
             # If we have an IBAN but no CSID, and description has personal indicators
-            personal_indicators = [
-                r'\b(naar|van|to|from)\s+[A-Z][a-z]+\b',  # "naar John" / "to John"
-                r'\bnaam:\s*[A-Z]',  # "Naam: J..."
-            ]
-            for indicator in personal_indicators:
-                if re.search(indicator, text, re.IGNORECASE):
+            for indicator in _PERSONAL_INDICATOR_RES:
+                if indicator.search(text):
                     return True
 
         return False
@@ -244,29 +510,27 @@ class SubscriptionDetector:
         if not text:
             return None
 
-        # Look for CSID pattern (NLxxZZZxxxxxxxxx) - SEPA Direct Debit creditor
-        # CSIDs can be 15-18 digits after the ZZZ
-        csid_match = re.search(r'\b(NL\d{2}ZZZ\d{9,18})\b', text, re.IGNORECASE)
-        if csid_match:
-            return csid_match.group(1).upper()
+        cached = self._csid_cache.get(text, _CACHE_MISS)
+        if cached is not _CACHE_MISS:
+            return cached
 
-        # Look for IBAN in context of transfers (for recurring transfers)
-        # Pattern: IBAN/NLxxAAAAxxxxxxxxxx or IBAN: NLxxAAAAxxxxxxxxxx
-        iban_match = re.search(r'IBAN[/: ]*([A-Z]{2}\d{2}[A-Z]{4}\d{10})\b', text, re.IGNORECASE)
-        if iban_match:
-            return iban_match.group(1).upper()
-
-        return None
+        result = _extract_csid_text(text)
+        self._csid_cache[text] = result
+        return result
 
     def _get_merchant_from_creditor_id(self, csid: str) -> Optional[str]:
         """Look up merchant name from CSID using prefix matching."""
         if not csid:
             return None
 
-        # Try prefix matching (CSIDs can have trailing digits)
-        for prefix, merchant in self.KNOWN_CREDITOR_PREFIXES.items():
+        # Prefix matching via bisect (CSIDs can have trailing digits): the
+        # candidate prefix is the entry sorting immediately at or before
+        # the CSID, so one O(log k) probe replaces the linear scan.
+        idx = bisect_right(self._SORTED_CREDITOR_PREFIXES, csid) - 1
+        if idx >= 0:
+            prefix = self._SORTED_CREDITOR_PREFIXES[idx]
             if csid.startswith(prefix):
-                return merchant
+                return self.KNOWN_CREDITOR_PREFIXES[prefix]
 
         return None
 
@@ -280,36 +544,24 @@ class SubscriptionDetector:
         if not text:
             return ""
 
-        normalized = text.lower().strip()
-
-        # Remove common noise patterns (but NOT CSID/IBAN - those are handled separately)
-        noise_patterns = [
-            r'\b\d{8,}\b',  # Very long numbers only (8+ digits)
-            r'\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}',  # Dates (DD/MM/YYYY)
-            r'\d{4}[-/.]\d{1,2}[-/.]\d{1,2}',  # ISO dates (YYYY-MM-DD)
-            r'\b\d{2}[-/]\d{4}\b',  # Month-year (01-2025)
-            r'\b(ref|nr|no|number|kenmerk|factnr|factuur|invoice)[.:# ]*\w*',  # Reference labels
-            r'\b(btw|vat|tax)[.:# ]*\d*%?\b',  # Tax references
-            r'\b(periode|period|termijn)[.:# ]*\w*\b',  # Period references
-            r'\b(bv|nv|ltd|inc|gmbh|llc|co|corp)\b\.?',  # Company suffixes
-            r'\bb\.v\.?\b|\bn\.v\.?\b',  # Dutch company suffixes with dots
-            r'[%€$£]',  # Currency/percentage symbols
-            r'/trtp/',  # Transaction type prefix
-            r'/csid/',  # CSID prefix (we extract the ID separately)
-            r'/iban/',  # IBAN prefix
-            r'/bic/',  # BIC prefix
-            r'/naam/',  # Name prefix
-            r'pas\d{3}',  # Card number suffix (PAS000)
-        ]
-
-        for pattern in noise_patterns:
-            normalized = re.sub(pattern, ' ', normalized, flags=re.IGNORECASE)
-
-        # Remove extra whitespace and trim
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        cached = self._norm_cache.get(text)
+        if cached is not None:
+            return cached
 
+        normalized = _normalize_description_text(text)
+        self._norm_cache[text] = normalized
         return normalized
 
+    def _description_trigrams(self, normalized: str) -> frozenset:
+        """Character trigram set of a normalized description, memoized."""
+        cached = self._tri_cache.get(normalized)
+        if cached is None:
+            cached = frozenset(
+                normalized[i:i + 3] for i in range(len(normalized) - 2)
+            )
+            self._tri_cache[normalized] = cached
+        return cached
+
     def _get_description_fingerprint(self, txn: Transaction) -> str:
         """
         Get a fingerprint for a transaction that can be used for initial grouping.
@@ -321,13 +573,24 @@ class SubscriptionDetector:
         4. Merchant field
         5. Significant words from description
         """
+        sid = getattr(txn, '_sid', None) or str(txn.id)
+        cached = self._fp_cache.get(sid)
+        if cached is not None:
+            return cached
+
+        fp = self._compute_description_fingerprint(txn)
+        self._fp_cache[sid] = fp
+        return fp
+
+    def _compute_description_fingerprint(self, txn: Transaction) -> str:
+        """Uncached fingerprint computation; see _get_description_fingerprint."""
         # Priority 1: SEPA Creditor ID or IBAN (most reliable for recurring payments)
         creditor_id = self._extract_sepa_creditor_id(txn.description)
         if creditor_id:
             return f"CREDITOR:{creditor_id}"
 
         # Priority 2: Try merchant extractor
-        result = self.merchant_extractor.extract(txn.description, txn.merchant)
+        result = self._extract_merchant(txn.description, txn.merchant)
         if result.merchant and result.confidence >= 70:
             return result.merchant.lower()
 
@@ -373,18 +636,18 @@ class SubscriptionDetector:
         if csid1 or csid2:
             return 0.3  # Low but not zero (might be same merchant, different payment method)
 
-        # Normalize descriptions
-        desc1 = self._normalize_description(txn1.description)
-        desc2 = self._normalize_description(txn2.description)
-
-        # Also consider merchant fields
+        # Exact merchant match decides before any description work, so
+        # the common same-merchant case skips normalization entirely.
         merchant1 = (txn1.merchant or "").lower().strip()
         merchant2 = (txn2.merchant or "").lower().strip()
 
-        # If both have merchants and they match exactly
         if merchant1 and merchant2 and merchant1 == merchant2:
             return 1.0
 
+        # Normalize descriptions
+        desc1 = self._normalize_description(txn1.description)
+        desc2 = self._normalize_description(txn2.description)
+
         # Use text similarity service
         if desc1 and desc2:
             result = self.text_similarity.calculate(desc1, desc2)
@@ -415,35 +678,31 @@ class SubscriptionDetector:
         if len(dates) < 2:
             return False, 0.0, 0.0
 
-        # Sort dates
-        sorted_dates = sorted(dates)
+        # Sort and diff on int64 epoch seconds; .days extraction becomes
+        # one integer floor-division over the whole array and the sort
+        # runs in place instead of copying a datetime64 array.
+        arr = np.asarray(dates, dtype='datetime64[s]').astype(np.int64)
+        arr.sort()
+        intervals = np.diff(arr) // 86400
+        intervals = intervals[intervals > 0]  # Ignore same-day transactions
 
-        # Calculate intervals between consecutive dates
-        intervals = []
-        for i in range(1, len(sorted_dates)):
-            days = (sorted_dates[i] - sorted_dates[i-1]).days
-            if days > 0:  # Ignore same-day transactions
-                intervals.append(days)
-
-        if not intervals:
+        if intervals.size == 0:
             return False, 0.0, 0.0
 
-        # Calculate statistics
-        avg_interval = sum(intervals) / len(intervals)
+        # Calculate statistics (JIT-compiled when numba is available)
+        avg_interval, std_dev = _interval_stats(intervals)
 
         if avg_interval < 5:  # Less than 5 days average = probably not a subscription
             return False, avg_interval, 0.0
 
         # Calculate how consistent the intervals are
-        if len(intervals) == 1:
+        if intervals.size == 1:
             # Only one interval - check if it's in a reasonable range
             if 5 <= intervals[0] <= 400:  # Between weekly and yearly
-                return True, intervals[0], 0.7  # Give it a decent score
-            return False, intervals[0], 0.0
+                return True, float(intervals[0]), 0.7  # Give it a decent score
+            return False, float(intervals[0]), 0.0
 
         # Calculate coefficient of variation (std_dev / mean)
-        variance = sum((x - avg_interval) ** 2 for x in intervals) / len(intervals)
-        std_dev = variance ** 0.5
         cv = std_dev / avg_interval if avg_interval > 0 else 1.0
 
         # Consistency score: lower CV = more consistent
@@ -457,7 +716,15 @@ class SubscriptionDetector:
 
     def _get_frequency_label(self, avg_days: float) -> str:
         """Convert average interval in days to a human-readable frequency."""
-        for label, (min_days, max_days) in self.FREQUENCY_LABELS.items():
+        # Label granularity is coarser than 0.1 day, so rounding the key
+        # makes repeated intervals hit the cache instead of rescanning
+        # the ranges.
+        return self._freq_label_cached(round(avg_days, 1))
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _freq_label_cached(avg_days: float) -> str:
+        for label, (min_days, max_days) in SubscriptionDetector.FREQUENCY_LABELS.items():
             if min_days <= avg_days <= max_days:
                 return label
 
@@ -485,18 +752,96 @@ class SubscriptionDetector:
     ) -> List[Transaction]:
         """
         Find all transactions similar to the target transaction.
+
+        Candidates needing full text similarity are scored in one
+        calculate_many() batch so the target description is normalized
+        and tokenized once for the whole group.
         """
         similar = [target_txn]
 
-        for txn in all_transactions:
-            if str(txn.id) in processed_ids:
+        candidates = [
+            txn for txn in all_transactions
+            if txn.id != target_txn.id and txn._sid not in processed_ids
+        ]
+        if not candidates:
+            return similar
+
+        csid1 = self._extract_sepa_creditor_id(target_txn.description)
+        merchant1 = (target_txn.merchant or "").lower().strip()
+        desc1 = self._normalize_description(target_txn.description)
+        tri1 = self._description_trigrams(desc1) if desc1 else frozenset()
+
+        scores: List[float] = [0.0] * len(candidates)
+        batch_indices: List[int] = []
+        batch_descs: List[str] = []
+
+        for i, txn in enumerate(candidates):
+            csid2 = self._extract_sepa_creditor_id(txn.description)
+
+            # Same CSID rules as _calculate_description_similarity
+            if csid1 and csid2:
+                scores[i] = 1.0 if csid1 == csid2 else 0.0
+                continue
+            if csid1 or csid2:
+                scores[i] = 0.3
                 continue
-            if txn.id == target_txn.id:
+
+            merchant2 = (txn.merchant or "").lower().strip()
+            if merchant1 and merchant2 and merchant1 == merchant2:
+                scores[i] = 1.0
                 continue
 
-            similarity = self._calculate_description_similarity(target_txn, txn)
+            desc2 = self._normalize_description(txn.description)
+            if desc1 and desc2:
+                # Trigram blocker: pairs whose smaller trigram set shares
+                # under TRIGRAM_BLOCK_OVERLAP with the other cannot get
+                # near the threshold, so they skip scoring entirely.
+                tri2 = self._description_trigrams(desc2)
+                if tri1 and tri2:
+                    smaller = min(len(tri1), len(tri2))
+                    if len(tri1 & tri2) < TRIGRAM_BLOCK_OVERLAP * smaller:
+                        continue
+                batch_indices.append(i)
+                batch_descs.append(desc2)
+                continue
 
-            if similarity >= TEXT_SIMILARITY_THRESHOLD:
+            if merchant1 and merchant2:
+                scores[i] = self.text_similarity.calculate(merchant1, merchant2).score / 100.0
+
+        if batch_indices:
+            # Recurring charges repeat near-identical texts, so score each
+            # distinct description/merchant string once and broadcast.
+            unique_descs = list(dict.fromkeys(batch_descs))
+            # Anything below this can't reach the threshold even with the
+            # maximum 0.3 merchant boost, so the scorer may bail early.
+            if merchant1:
+                cutoff = (TEXT_SIMILARITY_THRESHOLD - 0.3) / 0.7 * 100.0
+            else:
+                cutoff = TEXT_SIMILARITY_THRESHOLD * 100.0
+            batch_results = self.text_similarity.calculate_many(
+                desc1, unique_descs, score_cutoff=cutoff
+            )
+            desc_scores = {
+                desc: result.score / 100.0
+                for desc, result in zip(unique_descs, batch_results)
+            }
+            merchant_scores: Dict[str, float] = {}
+            for i, desc2 in zip(batch_indices, batch_descs):
+                score = desc_scores[desc2]
+                merchant2 = (candidates[i].merchant or "").lower().strip()
+                # Boost if merchants are similar too
+                if merchant1 and merchant2:
+                    merchant_score = merchant_scores.get(merchant2)
+                    if merchant_score is None:
+                        merchant_score = (
+                            self.text_similarity.calculate(merchant1, merchant2).score / 100.0
+                        )
+                        merchant_scores[merchant2] = merchant_score
+                    score = 0.7 * score + 0.3 * merchant_score
+                scores[i] = score
+
+        for txn, score in zip(candidates, scores):
+            if score >= TEXT_SIMILARITY_THRESHOLD:
                 similar.append(txn)
 
         return similar
@@ -517,26 +862,23 @@ class SubscriptionDetector:
             (filtered_transactions, avg_amount, amount_cv)
         """
         if len(transactions) < 2:
-            amounts = [abs(float(t.amount)) for t in transactions]
+            amounts = [t._abs_amt for t in transactions]
             avg = sum(amounts) / len(amounts) if amounts else 0
             return transactions, avg, 0.0
 
-        # Step 1: Cluster transactions by amount (20% tolerance)
-        amount_clusters: List[List[Transaction]] = []
+        # Step 1: Cluster transactions by amount (20% tolerance). Sorting
+        # by amount first lets a single linear sweep with an incrementally
+        # maintained mean replace the per-txn scan over all clusters; the
+        # sweep itself lives in the _amount_cluster_ids kernel.
+        txns_sorted = sorted(transactions, key=lambda t: t._abs_amt)
+        amts = np.array([t._abs_amt for t in txns_sorted], dtype=np.float64)
+        cluster_ids = _amount_cluster_ids(amts, 0.20)
 
-        for txn in transactions:
-            amt = abs(float(txn.amount))
-            placed = False
-
-            for cluster in amount_clusters:
-                cluster_avg = sum(abs(float(t.amount)) for t in cluster) / len(cluster)
-                if abs(amt - cluster_avg) / max(amt, cluster_avg) <= 0.20:
-                    cluster.append(txn)
-                    placed = True
-                    break
-
-            if not placed:
-                amount_clusters.append([txn])
+        amount_clusters: List[List[Transaction]] = []
+        for txn, cluster_id in zip(txns_sorted, cluster_ids):
+            if cluster_id == len(amount_clusters):
+                amount_clusters.append([])
+            amount_clusters[cluster_id].append(txn)
 
         # Step 2: For each cluster with 2+ transactions, check interval consistency
         best_cluster = None
@@ -580,15 +922,8 @@ class SubscriptionDetector:
             best_cluster = max(amount_clusters, key=len)
 
         # Calculate stats for the selected cluster
-        amounts = [abs(float(t.amount)) for t in best_cluster]
-        avg_amount = sum(amounts) / len(amounts)
-
-        if len(amounts) > 1:
-            variance = sum((a - avg_amount) ** 2 for a in amounts) / len(amounts)
-            std_dev = variance ** 0.5
-            amount_cv = std_dev / avg_amount if avg_amount > 0 else 0
-        else:
-            amount_cv = 0.0
+        amounts = np.array([t._abs_amt for t in best_cluster], dtype=np.float64)
+        avg_amount, amount_cv = _amount_stats(amounts)
 
         return best_cluster, avg_amount, amount_cv
 
@@ -617,11 +952,8 @@ class SubscriptionDetector:
                 return None
         else:
             # Non-CSID groups: use all transactions
-            amounts = [abs(float(txn.amount)) for txn in transactions]
-            avg_amount = sum(amounts) / len(amounts)
-            amount_variance = sum((a - avg_amount) ** 2 for a in amounts) / len(amounts)
-            amount_std = amount_variance ** 0.5
-            amount_cv = amount_std / avg_amount if avg_amount > 0 else 0
+            amounts = np.array([txn._abs_amt for txn in transactions], dtype=np.float64)
+            avg_amount, amount_cv = _amount_stats(amounts)
 
         # Get dates from the (possibly filtered) transactions
         dates = [txn.booked_at for txn in transactions if txn.booked_at]
@@ -704,7 +1036,7 @@ class SubscriptionDetector:
             currency=first_txn.currency or "EUR",
             detected_frequency=frequency_label,
             confidence=confidence,
-            matched_transaction_ids=[str(txn.id) for txn in sorted_txns],
+            matched_transaction_ids=tuple(txn._sid for txn in sorted_txns),
             match_count=len(transactions),
             avg_interval_days=avg_interval,
             category_id=category_id,
@@ -727,7 +1059,7 @@ class SubscriptionDetector:
             if known_merchant == 'Mollie':
                 # Look for merchant name after "Mollie" in description
                 for txn in transactions:
-                    result = self.merchant_extractor.extract(txn.description, txn.merchant)
+                    result = self._extract_merchant(txn.description, txn.merchant)
                     if result.merchant and result.merchant.lower() != 'mollie':
                         return result.merchant, result.merchant
 
@@ -735,27 +1067,27 @@ class SubscriptionDetector:
 
         # Priority 2: Try merchant extractor on each transaction
         for txn in transactions:
-            result = self.merchant_extractor.extract(txn.description, txn.merchant)
+            result = self._extract_merchant(txn.description, txn.merchant)
             if result.merchant and result.confidence >= 70:
                 return result.merchant, result.merchant
 
         # Priority 3: Use most common merchant field
-        merchants = [txn.merchant for txn in transactions if txn.merchant]
-        if merchants:
-            most_common = max(set(merchants), key=merchants.count)
+        merchant_counts = Counter(txn.merchant for txn in transactions if txn.merchant)
+        if merchant_counts:
+            most_common = merchant_counts.most_common(1)[0][0]
             return most_common, most_common
 
         # Priority 4: Extract name from SEPA transfer description (Naam: or /NAME/)
         for txn in transactions:
             desc = txn.description or ""
             # Look for "Naam: XXX" pattern
-            naam_match = re.search(r'Naam:\s*([^\s/][^/\n]{2,})', desc, re.IGNORECASE)
+            naam_match = _NAAM_RE.search(desc)
             if naam_match:
                 name = naam_match.group(1).strip()
                 if name:
                     return name, name
             # Look for "/NAME/XXX/" pattern
-            name_match = re.search(r'/NAME/([^/]+)', desc, re.IGNORECASE)
+            name_match = _SLASH_NAME_RE.search(desc)
             if name_match:
                 name = name_match.group(1).strip()
                 if name:
@@ -767,10 +1099,7 @@ class SubscriptionDetector:
             for txn in transactions:
                 normalized = self._normalize_description(txn.description)
                 # Remove common SEPA prefixes
-                cleaned = re.sub(
-                    r'^(sepa\s+)?(incasso\s+)?(algemeen\s+)?(doorlopend\s+)?',
-                    '', normalized, flags=re.IGNORECASE
-                ).strip()
+                cleaned = _SEPA_PREFIX_RE.sub('', normalized).strip()
                 if cleaned and len(cleaned) >= 3:
                     return cleaned[:50].title(), None
 
@@ -809,18 +1138,27 @@ class SubscriptionDetector:
 
     def _matches_existing_subscription(self, pattern: DetectedPattern) -> bool:
         """Check if a pattern matches an existing active subscription."""
-        existing = self._load_existing_subscriptions()
+        self._load_existing_subscriptions()
+
+        pattern_amount = abs(float(pattern.suggested_amount))
+        if pattern_amount > 0:
+            bucket = self._amount_bucket(pattern_amount)
+            candidates: List[RecurringTransaction] = []
+            for key in (bucket - 1, bucket, bucket + 1, None):
+                candidates.extend(self._existing_by_amt_bucket.get(key, ()))
+        else:
+            # Zero-amount patterns skip the amount check, so every
+            # indexed subscription is a candidate.
+            candidates = [
+                sub for subs in self._existing_by_amt_bucket.values() for sub in subs
+            ]
 
-        for sub in existing:
-            # Matching is account-scoped. Ignore legacy account-agnostic entries.
-            if not sub.account_id:
-                continue
+        for sub in candidates:
             if str(sub.account_id) != pattern.account_id:
                 continue
 
             # Check amount match (within tolerance)
             sub_amount = abs(float(sub.amount))
-            pattern_amount = abs(float(pattern.suggested_amount))
 
             if sub_amount > 0 and pattern_amount > 0:
                 diff = abs(sub_amount - pattern_amount)
@@ -843,13 +1181,36 @@ class SubscriptionDetector:
 
     def _check_similar_pending_suggestion(
         self,
-        pattern: DetectedPattern
+        pattern: DetectedPattern,
+        pending: Optional[List[SubscriptionSuggestion]] = None
     ) -> Optional[SubscriptionSuggestion]:
-        """Check if a similar suggestion already exists (pending)."""
-        pending = self.db.query(SubscriptionSuggestion).filter(
-            SubscriptionSuggestion.user_id == self.user_id,
-            SubscriptionSuggestion.status == "pending"
-        ).all()
+        """Check if a similar suggestion already exists (pending).
+
+        ``pending`` lets batch callers prefetch all pending suggestions
+        once instead of one query per pattern; without it the query runs
+        here with SQL pre-filters on account and amount range. The
+        bracket is a superset of the 20%-of-average check below, which
+        stays authoritative either way.
+        """
+        if pending is None:
+            query = self.db.query(SubscriptionSuggestion).filter(
+                SubscriptionSuggestion.user_id == self.user_id,
+                SubscriptionSuggestion.status == "pending"
+            )
+
+            account_uuid = self._to_uuid(pattern.account_id)
+            if account_uuid is not None:
+                query = query.filter(SubscriptionSuggestion.account_id == account_uuid)
+
+            pat_amount_bound = abs(float(pattern.suggested_amount))
+            if pat_amount_bound > 0:
+                abs_amount = func.abs(SubscriptionSuggestion.suggested_amount)
+                query = query.filter(
+                    (abs_amount == 0)
+                    | abs_amount.between(pat_amount_bound * 0.75, pat_amount_bound * 1.25)
+                )
+
+            pending = query.all()
 
         for suggestion in pending:
             suggestion_account_id = str(suggestion.account_id) if suggestion.account_id else None
@@ -907,8 +1268,30 @@ class SubscriptionDetector:
             + (f" (scoped to {len(account_ids)} accounts)" if account_ids else " (all accounts)")
         )
 
-        # Full-history scan by default (lookback is optional).
-        query = self.db.query(Transaction).filter(
+        # Full-history scan by default (lookback is optional). CSID/IBAN
+        # extraction rides along as server-side regex columns (Postgres'
+        # C regex engine), so Python never has to scan the descriptions
+        # that contain neither.
+        csid_expr = func.substring(
+            Transaction.description, r'(?i)\mNL[0-9]{2}ZZZ[0-9]{9,18}\M'
+        )
+        iban_expr = func.substring(
+            Transaction.description,
+            r'(?i)IBAN[/: ]*([A-Z]{2}[0-9]{2}[A-Z]{4}[0-9]{10})\M'
+        )
+        query = self.db.query(
+            Transaction.id,
+            Transaction.account_id,
+            Transaction.description,
+            Transaction.merchant,
+            Transaction.amount,
+            Transaction.currency,
+            Transaction.booked_at,
+            Transaction.category_id,
+            Transaction.category_system_id,
+            csid_expr,
+            iban_expr,
+        ).filter(
             Transaction.user_id == self.user_id,
             Transaction.amount < 0,  # Only expenses
         )
@@ -921,7 +1304,34 @@ class SubscriptionDetector:
             lookback_date = datetime.utcnow() - timedelta(days=lookback_days)
             query = query.filter(Transaction.booked_at >= lookback_date)
 
-        transactions = query.order_by(Transaction.account_id.asc(), Transaction.booked_at.asc()).all()
+        # Stream plain column rows instead of hydrating full Transaction
+        # entities: no relationship prep, no identity-map growth, and the
+        # Decimal→float and UUID→str coercions happen once at ingress.
+        rows = query.order_by(
+            Transaction.account_id.asc(), Transaction.booked_at.asc()
+        ).yield_per(1000)
+
+        transactions: List[_TxnRow] = []
+        for (
+            txn_id, account_id, description, merchant, amount, currency,
+            booked_at, category_id, category_system_id, csid, iban,
+        ) in rows:
+            transactions.append(_TxnRow(
+                id=txn_id,
+                account_id=account_id,
+                description=description,
+                merchant=merchant,
+                amount=amount,
+                currency=currency,
+                booked_at=booked_at,
+                category_id=category_id,
+                category_system_id=category_system_id,
+                _abs_amt=abs(float(amount)),
+                _sid=str(txn_id),
+            ))
+            if description:
+                found = csid or iban
+                self._csid_cache[description] = found.upper() if found else None
 
         if not transactions:
             logger.info("[SUBSCRIPTION_DETECTOR] No expense transactions found")
@@ -959,51 +1369,36 @@ class SubscriptionDetector:
         )
 
         # Group transactions by account first.
-        account_groups: Dict[str, List[Transaction]] = defaultdict(list)
+        account_groups: Dict[str, List[_TxnRow]] = defaultdict(list)
         for txn in transactions:
             account_groups[str(txn.account_id)].append(txn)
 
-        patterns: List[DetectedPattern] = []
-        for account_id, account_txns in account_groups.items():
-            if len(account_txns) < MIN_TRANSACTIONS:
-                continue
-
-            account_latest_date = latest_by_account.get(account_id)
-            if not account_latest_date:
-                continue
-
-            fingerprint_groups: Dict[str, List[Transaction]] = defaultdict(list)
-            for txn in account_txns:
-                fp = self._get_description_fingerprint(txn)
-                if fp:
-                    fingerprint_groups[fp].append(txn)
-
-            processed_ids: Set[str] = set()
-            for group_txns in fingerprint_groups.values():
-                if len(group_txns) < MIN_TRANSACTIONS:
-                    continue
-
-                unprocessed = [t for t in group_txns if str(t.id) not in processed_ids]
-                if len(unprocessed) < MIN_TRANSACTIONS:
-                    continue
-
-                for txn in unprocessed:
-                    if str(txn.id) in processed_ids:
-                        continue
-
-                    similar = self._find_similar_transactions(txn, account_txns, processed_ids)
-                    if len(similar) < MIN_TRANSACTIONS:
-                        continue
-
-                    pattern = self._analyze_transaction_group(
-                        similar,
-                        account_latest_date=account_latest_date
-                    )
+        # Accounts are independent (own transactions, own processed set),
+        # so multi-account users fan out across a thread pool. Results
+        # are gathered in submission order, keeping output identical to
+        # the serial loop; the shared memo dicts only risk a duplicate
+        # computation under the GIL, never a wrong value.
+        account_items = [
+            (account_id, account_txns, latest_by_account[account_id])
+            for account_id, account_txns in account_groups.items()
+            if len(account_txns) >= MIN_TRANSACTIONS
+            and latest_by_account.get(account_id)
+        ]
 
-                    if pattern:
-                        patterns.append(pattern)
-                        for t in similar:
-                            processed_ids.add(str(t.id))
+        patterns: List[DetectedPattern] = []
+        if len(account_items) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(len(account_items), os.cpu_count() or 1)
+            ) as pool:
+                futures = [
+                    pool.submit(self._detect_account_patterns, account_txns, latest)
+                    for _account_id, account_txns, latest in account_items
+                ]
+                for future in futures:
+                    patterns.extend(future.result())
+        else:
+            for _account_id, account_txns, latest in account_items:
+                patterns.extend(self._detect_account_patterns(account_txns, latest))
 
         logger.info(
             f"[SUBSCRIPTION_DETECTOR] Found {len(patterns)} potential patterns"
@@ -1029,6 +1424,96 @@ class SubscriptionDetector:
                 f"€{p.suggested_amount}, {p.match_count} txns, {p.confidence}% confidence"
             )
 
+        # Extraction results are only reusable within one detection run.
+        self._merchant_cache.clear()
+
+        return patterns
+
+    def _detect_account_patterns(
+        self,
+        account_txns: List[_TxnRow],
+        account_latest_date: datetime
+    ) -> List[DetectedPattern]:
+        """
+        Detect patterns within one account's transactions.
+
+        Pure in-memory analysis over prefetched rows (no session access),
+        so detect_patterns can run accounts concurrently.
+        """
+        # Group by fingerprint with pandas' C-level hash instead of a
+        # per-row dict/append loop; sort=False keeps first-occurrence
+        # key order so downstream tie-breaking is unchanged.
+        fps = [self._get_description_fingerprint(txn) for txn in account_txns]
+        grouped = pd.Series(range(len(account_txns))).groupby(fps, sort=False).indices
+        fingerprint_groups: Dict[str, List[_TxnRow]] = {
+            fp: [account_txns[i] for i in ix]
+            for fp, ix in grouped.items()
+            if fp
+        }
+
+        patterns: List[DetectedPattern] = []
+        processed_ids: Set[str] = set()
+        for fingerprint, group_txns in fingerprint_groups.items():
+            if len(group_txns) < MIN_TRANSACTIONS:
+                continue
+
+            unprocessed = [t for t in group_txns if t._sid not in processed_ids]
+            if len(unprocessed) < MIN_TRANSACTIONS:
+                continue
+
+            # CSID fingerprints are exact groups already (same creditor
+            # = same subscription), so pairwise similarity is redundant.
+            if fingerprint.startswith("CREDITOR:"):
+                pattern = self._analyze_transaction_group(
+                    unprocessed,
+                    account_latest_date=account_latest_date
+                )
+                if pattern:
+                    patterns.append(pattern)
+                    for t in unprocessed:
+                        processed_ids.add(t._sid)
+                continue
+
+            # Same-fingerprint transactions are near-duplicates by
+            # construction, so whole-group analysis usually succeeds
+            # without any pairwise similarity scoring.
+            pattern = self._analyze_transaction_group(
+                unprocessed,
+                account_latest_date=account_latest_date
+            )
+            if pattern:
+                patterns.append(pattern)
+                for t in unprocessed:
+                    processed_ids.add(t._sid)
+                continue
+
+            # Whole-group analysis failed (e.g. mixed merchants behind
+            # one fingerprint); fall back to the pairwise scan for
+            # groups small enough that quadratic scoring is cheap.
+            if len(unprocessed) > MAX_SIMILARITY_SCAN_GROUP:
+                continue
+
+            for txn in unprocessed:
+                if txn._sid in processed_ids:
+                    continue
+
+                # Blocking: transactions in other fingerprint buckets
+                # already score below the similarity threshold, so only
+                # compare within this bucket.
+                similar = self._find_similar_transactions(txn, group_txns, processed_ids)
+                if len(similar) < MIN_TRANSACTIONS:
+                    continue
+
+                pattern = self._analyze_transaction_group(
+                    similar,
+                    account_latest_date=account_latest_date
+                )
+
+                if pattern:
+                    patterns.append(pattern)
+                    for t in similar:
+                        processed_ids.add(t._sid)
+
         return patterns
 
     def save_suggestions(
@@ -1041,9 +1526,16 @@ class SubscriptionDetector:
 
         created = []
 
+        # One query covers dedup for the whole batch; suggestions created
+        # below are appended so later patterns also dedup against them.
+        pending = self.db.query(SubscriptionSuggestion).filter(
+            SubscriptionSuggestion.user_id == self.user_id,
+            SubscriptionSuggestion.status == "pending"
+        ).all()
+
         for pattern in patterns:
             # Check for existing similar suggestion
-            existing = self._check_similar_pending_suggestion(pattern)
+            existing = self._check_similar_pending_suggestion(pattern, pending=pending)
             if existing:
                 logger.debug(
                     f"[SUBSCRIPTION_DETECTOR] Skipping '{pattern.suggested_name}' "
@@ -1068,6 +1560,7 @@ class SubscriptionDetector:
 
             self.db.add(suggestion)
             created.append(suggestion)
+            pending.append(suggestion)
 
             logger.info(
                 f"[SUBSCRIPTION_DETECTOR] Created suggestion: '{pattern.suggested_name}' "
@@ -1188,7 +1681,7 @@ class SubscriptionDetector:
     def _link_transactions_to_subscription(
         self,
         subscription: RecurringTransaction,
-        transaction_ids: List[str]
+        transaction_ids: Sequence[str]
     ) -> int:
         """Link matched transactions to a subscription, with safe account-aware reassignment."""
         if not transaction_ids:
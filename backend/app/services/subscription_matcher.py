@@ -18,7 +18,9 @@ Usage:
 """
 import os
 import logging
-from typing import Optional, List, Dict
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Tuple
 from decimal import Decimal
 from uuid import UUID
 from sqlalchemy.orm import Session
@@ -32,6 +34,16 @@ from app.services.merchant_extractor import MerchantExtractor
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class _PreparedSubscription:
+    """A cached subscription with match inputs precomputed at load time."""
+    subscription: RecurringTransaction
+    abs_amount: float
+    abs_cents: int
+    name_prep: Optional[Tuple[str, frozenset]]
+    merchant_prep: Optional[Tuple[str, frozenset]]
+
+
 # Configuration
 ENABLE_AUTO_SUBSCRIPTION_MATCHING = os.getenv(
     "ENABLE_AUTO_SUBSCRIPTION_MATCHING", "true"
@@ -43,6 +55,10 @@ MIN_MATCH_SCORE = float(os.getenv("SUBSCRIPTION_MIN_MATCH_SCORE", "60.0"))
 # Amount tolerance (percentage difference allowed)
 AMOUNT_TOLERANCE_PERCENT = float(os.getenv("SUBSCRIPTION_AMOUNT_TOLERANCE", "0.05"))
 
+# Same tolerance in basis points, for the integer cents comparison in
+# _amount_matches (diff/avg <= tol  <=>  2*diff_c * 10000 <= bps * sum_c).
+AMOUNT_TOLERANCE_BPS = int(round(AMOUNT_TOLERANCE_PERCENT * 10000))
+
 
 class SubscriptionMatcher:
     """
@@ -62,6 +78,16 @@ class SubscriptionMatcher:
         self.db = db
         self.user_id = user_id if user_id else get_user_id(user_id)
         self._subscription_cache: Dict[Optional[str], List[RecurringTransaction]] = {}
+        # Parallel (sorted_abs_amounts, prepared subscriptions) arrays per
+        # cache key, so match_transaction only scores the amount-feasible
+        # window and never re-tokenizes subscription fields.
+        self._amount_index: Dict[
+            Optional[str], Tuple[List[float], List[Tuple[int, _PreparedSubscription]]]
+        ] = {}
+        # O(1) fast path: normalized subscription name/merchant → prepared
+        # entry, for transactions whose merchant or description equals a
+        # subscription name outright (the common well-branded case).
+        self._exact_index: Dict[Optional[str], Dict[str, _PreparedSubscription]] = {}
         self._text_similarity = TextSimilarity()
         self._merchant_extractor = MerchantExtractor()
 
@@ -99,6 +125,33 @@ class SubscriptionMatcher:
             subscriptions = query.all()
             self._subscription_cache[cache_key] = subscriptions
 
+            prepared = []
+            for sub in subscriptions:
+                abs_amount = abs(float(sub.amount))
+                prepared.append(_PreparedSubscription(
+                    subscription=sub,
+                    abs_amount=abs_amount,
+                    abs_cents=int(round(abs_amount * 100)),
+                    name_prep=TextSimilarity.prepare(sub.name),
+                    merchant_prep=TextSimilarity.prepare(sub.merchant),
+                ))
+            indexed = sorted(enumerate(prepared), key=lambda pair: (pair[1].abs_amount, pair[0]))
+            self._amount_index[cache_key] = (
+                [prep.abs_amount for _, prep in indexed],
+                indexed,
+            )
+
+            # setdefault keeps the first subscription in load order, the
+            # same one the full scan's strict-improvement rule would keep
+            # on an exact-score tie.
+            exact: Dict[str, _PreparedSubscription] = {}
+            for prep in prepared:
+                if prep.name_prep:
+                    exact.setdefault(prep.name_prep[0], prep)
+                if prep.merchant_prep:
+                    exact.setdefault(prep.merchant_prep[0], prep)
+            self._exact_index[cache_key] = exact
+
             logger.debug(
                 f"[SUBSCRIPTION_MATCHER] Loaded {len(subscriptions)} "
                 f"active subscriptions for user {self.user_id} (account={cache_key or 'any'})"
@@ -109,68 +162,86 @@ class SubscriptionMatcher:
     def clear_cache(self):
         """Clear the subscription cache. Call after subscription updates."""
         self._subscription_cache = {}
+        self._amount_index = {}
+        self._exact_index = {}
+
+    def _amount_window(
+        self,
+        cache_key: Optional[str],
+        txn_amount: float,
+        tolerance_percent: float = AMOUNT_TOLERANCE_PERCENT
+    ) -> List[_PreparedSubscription]:
+        """
+        Subscriptions whose amount can pass _amount_matches for this
+        absolute transaction amount. Bounds are widened a hair so float
+        rounding never drops a boundary candidate; _amount_matches stays
+        authoritative.
+        """
+        amounts, subs = self._amount_index[cache_key]
+        lo = txn_amount * (2 - tolerance_percent) / (2 + tolerance_percent) * 0.999
+        hi = txn_amount * (2 + tolerance_percent) / (2 - tolerance_percent) * 1.001
+        window = subs[bisect_left(amounts, lo):bisect_right(amounts, hi)]
+        # Restore load order so score ties resolve exactly as the full scan did.
+        window.sort(key=lambda pair: pair[0])
+        return [prep for _, prep in window]
 
     @staticmethod
     def _amount_matches(
-        subscription_amount: Decimal,
-        transaction_amount: Decimal,
-        tolerance_percent: float = AMOUNT_TOLERANCE_PERCENT
+        sub_cents: int,
+        txn_cents: int,
+        tolerance_bps: int = AMOUNT_TOLERANCE_BPS
     ) -> bool:
         """
         Check if transaction amount matches subscription amount within tolerance.
 
+        Both amounts are absolute integer cents (converted once per
+        transaction / at subscription cache build), so the per-pair check
+        is pure integer arithmetic: diff/avg <= tolerance rearranged to
+        avoid the floating-point division entirely.
+
         Args:
-            subscription_amount: Expected subscription amount (positive)
-            transaction_amount: Transaction amount (can be negative for expenses)
-            tolerance_percent: Maximum percentage difference allowed
+            sub_cents: Expected subscription amount (absolute cents)
+            txn_cents: Transaction amount (absolute cents)
+            tolerance_bps: Maximum percentage difference, in basis points
 
         Returns:
             True if amounts match within tolerance
         """
-        # Use absolute values for comparison
-        sub_amount = abs(float(subscription_amount))
-        txn_amount = abs(float(transaction_amount))
-
-        if sub_amount == 0 or txn_amount == 0:
+        if sub_cents == 0 or txn_cents == 0:
             return False
 
-        # Calculate percentage difference
-        diff = abs(sub_amount - txn_amount)
-        avg = (sub_amount + txn_amount) / 2
-
-        if avg == 0:
-            return False
-
-        percentage_diff = diff / avg
-        return percentage_diff <= tolerance_percent
+        # diff / ((sub + txn) / 2) <= bps / 10000
+        return 20000 * abs(sub_cents - txn_cents) <= tolerance_bps * (sub_cents + txn_cents)
 
     def _calculate_match_score(
         self,
-        subscription: RecurringTransaction,
+        prepared: _PreparedSubscription,
         description: Optional[str],
         merchant: Optional[str],
-        amount: Decimal
+        txn_amount: float,
+        txn_cents: int
     ) -> tuple[float, str]:
         """
-        Calculate match score between a subscription and transaction.
+        Calculate match score between a cached subscription and transaction.
 
         Args:
-            subscription: Subscription to match against
+            prepared: Cached subscription with precomputed match inputs
             description: Transaction description
             merchant: Transaction merchant
-            amount: Transaction amount
+            txn_amount: Absolute transaction amount
+            txn_cents: Absolute transaction amount in integer cents
 
         Returns:
             Tuple of (score 0-100, match_reason)
         """
         # Amount check is a prerequisite
-        if not self._amount_matches(subscription.amount, amount):
+        if not self._amount_matches(prepared.abs_cents, txn_cents):
             return 0.0, "amount_mismatch"
 
         # Calculate text similarity
-        text_score, method = self._text_similarity.calculate_match_score(
-            subscription_name=subscription.name,
-            subscription_merchant=subscription.merchant,
+        text_score, method = self._text_similarity.calculate_match_score_prepared(
+            subscription_name_prep=prepared.name_prep,
+            subscription_merchant_prep=prepared.merchant_prep,
             transaction_description=description,
             transaction_merchant=merchant
         )
@@ -179,9 +250,7 @@ class SubscriptionMatcher:
             return 0.0, "no_text_match"
 
         # Boost score if amount is exact match
-        sub_amount = abs(float(subscription.amount))
-        txn_amount = abs(float(amount))
-        if abs(sub_amount - txn_amount) < 0.01:  # Exact match within 1 cent
+        if abs(prepared.abs_amount - txn_amount) < 0.01:  # Exact match within 1 cent
             text_score = min(text_score + 10, 100)
 
         return text_score, method
@@ -209,9 +278,13 @@ class SubscriptionMatcher:
         if not ENABLE_AUTO_SUBSCRIPTION_MATCHING:
             return None
 
-        # Skip income transactions (subscriptions are expenses)
-        if float(amount) > 0:
+        # Skip income transactions (subscriptions are expenses).
+        # Decimal→float conversion happens once here for the whole match.
+        amount_f = float(amount)
+        if amount_f > 0:
             return None
+        txn_amount = abs(amount_f)
+        txn_cents = int(round(txn_amount * 100))
 
         # Try to extract merchant if not provided
         if not merchant and description:
@@ -225,16 +298,47 @@ class SubscriptionMatcher:
         if not subscriptions:
             return None
 
+        cache_key = str(account_id) if account_id else None
+
+        # Fast path: transaction merchant or description equals a
+        # subscription name/merchant after normalization. An exact hit
+        # scores 100, which nothing can beat, so the scoring loop is
+        # skipped - unless the account-agnostic penalty could apply,
+        # where a rival account-scoped match might still win.
+        exact_index = self._exact_index[cache_key]
+        if exact_index:
+            for text in (merchant, description):
+                if not text:
+                    continue
+                hit = exact_index.get(TextSimilarity.normalize(text))
+                if hit is None:
+                    continue
+                if account_id and not hit.subscription.account_id:
+                    break
+                if min_score <= 100 and self._amount_matches(hit.abs_cents, txn_cents):
+                    logger.info(
+                        f"[SUBSCRIPTION_MATCHER] Matched transaction to "
+                        f"'{hit.subscription.name}' (exact normalized hit)"
+                    )
+                    return hit.subscription
+                break
+
+        # Amount match is a prerequisite for any score, so only the
+        # amount-feasible window needs text scoring.
+        candidates = self._amount_window(cache_key, txn_amount)
+
         best_match = None
         best_score = 0.0
         best_reason = ""
 
-        for subscription in subscriptions:
+        for prepared in candidates:
+            subscription = prepared.subscription
             score, reason = self._calculate_match_score(
-                subscription=subscription,
+                prepared=prepared,
                 description=description,
                 merchant=merchant,
-                amount=amount
+                txn_amount=txn_amount,
+                txn_cents=txn_cents
             )
 
             # Prefer account-scoped matches over legacy account-agnostic matches.
@@ -286,6 +390,14 @@ class SubscriptionMatcher:
         results = {}
         matched_count = 0
 
+        # Recurring charges repeat identical (description, merchant,
+        # amount) rows, so score each distinct input once and broadcast
+        # the result across its duplicates.
+        match_memo: Dict[
+            Tuple[Optional[str], Optional[str], str, Optional[str]],
+            Optional[RecurringTransaction]
+        ] = {}
+
         for txn in transactions:
             txn_id = txn.get('id')
             description = txn.get('description')
@@ -300,13 +412,23 @@ class SubscriptionMatcher:
             if not isinstance(amount, Decimal):
                 amount = Decimal(str(amount))
 
-            match = self.match_transaction(
-                description=description,
-                merchant=merchant,
-                amount=amount,
-                account_id=account_id,
-                min_score=min_score
+            memo_key = (
+                description,
+                merchant,
+                str(amount),
+                str(account_id) if account_id else None,
             )
+            if memo_key in match_memo:
+                match = match_memo[memo_key]
+            else:
+                match = self.match_transaction(
+                    description=description,
+                    merchant=merchant,
+                    amount=amount,
+                    account_id=account_id,
+                    min_score=min_score
+                )
+                match_memo[memo_key] = match
 
             if match:
                 results[txn_id] = match
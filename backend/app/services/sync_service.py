@@ -2,11 +2,14 @@
 Service for syncing bank data (accounts and transactions).
 """
 import logging as _logging
+from contextlib import contextmanager
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import func, insert, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from decimal import Decimal
+from uuid import uuid4
 
 _logger = _logging.getLogger(__name__)
 
@@ -25,6 +28,23 @@ from app.security.data_encryption import (
 )
 
 
+@contextmanager
+def no_expire_on_commit(session: Session):
+    """
+    Temporarily disable expire_on_commit.
+
+    Sync methods commit mid-flow and then keep reading the same ORM
+    objects; with the default expire-on-commit every attribute access
+    after the commit triggers a lazy reload SELECT per object.
+    """
+    previous = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        yield session
+    finally:
+        session.expire_on_commit = previous
+
+
 class SyncService:
     """Service for syncing bank data."""
 
@@ -189,20 +209,72 @@ class SyncService:
                 self.db.add(new_account)
                 synced_accounts.append(new_account)
         
-        self.db.commit()
-        
-        # Refresh all accounts
-        for account in synced_accounts:
-            self.db.refresh(account)
-        
+        # Callers read these accounts right after the commit; committing
+        # without expiry keeps their attributes populated (no per-account
+        # reload SELECT, no refresh loop).
+        with no_expire_on_commit(self.db):
+            self.db.commit()
+
         return synced_accounts
     
+    # Above this row count the batched creates go through COPY instead
+    # of executemany INSERT. Only cold loads (first sync of an account's
+    # full history) reach it; incremental syncs stay on the INSERT path.
+    COPY_MIN_ROWS = 1000
+
+    def _write_insert_rows(self, insert_rows: List[Dict[str, Any]]) -> None:
+        """
+        Write the batched create rows, via COPY for large cold batches.
+
+        COPY streams rows over one protocol frame on the session's own
+        connection, so it stays inside the session transaction and
+        commits (or rolls back) with it; an executemany INSERT pays
+        per-batch parse/plan overhead that dominates on initial
+        multi-year backfills.
+        """
+        if len(insert_rows) < self.COPY_MIN_ROWS:
+            self.db.execute(insert(Transaction), insert_rows)
+            return
+
+        # Columns with client-side defaults must be supplied explicitly:
+        # COPY only applies server-side DDL defaults.
+        base_columns = list(insert_rows[0].keys())
+        columns = base_columns + ["include_in_analytics", "created_at", "updated_at"]
+        copy_sql = "COPY transactions ({}) FROM STDIN".format(", ".join(columns))
+        now = datetime.utcnow()
+
+        raw = self.db.connection().connection
+        with raw.cursor() as cursor:
+            with cursor.copy(copy_sql) as copy:
+                for row in insert_rows:
+                    copy.write_row(
+                        tuple(row[col] for col in base_columns) + (True, now, now)
+                    )
+
+    def _write_null_eid_inserts(
+        self,
+        insert_rows: List[Dict[str, Any]],
+        pending_insert_eids: set,
+    ) -> None:
+        """
+        Write out the batched insert rows if any of them lack an
+        external_id. Such rows must be visible to the external_id IS NULL
+        matcher queries, which the old per-row flush guaranteed; rows
+        with an external_id can stay batched. Batched external_ids are
+        unique, so a size mismatch means a NULL-eid row is pending.
+        """
+        if len(insert_rows) > len(pending_insert_eids):
+            self.db.execute(insert(Transaction), insert_rows)
+            insert_rows.clear()
+            pending_insert_eids.clear()
+
     def sync_transactions(
         self,
         adapter: BankAdapter,
         account: Account,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
+        prefetched_transactions: Optional[List[TransactionData]] = None,
     ) -> tuple[int, int, List[str], List[str]]:
         """
         Sync transactions for an account.
@@ -212,6 +284,9 @@ class SyncService:
             account: Account to sync transactions for
             start_date: Optional start date for transaction range
             end_date: Optional end date for transaction range
+            prefetched_transactions: Optional pre-fetched payload; when
+                given, skips the adapter fetch so callers can fan out the
+                HTTP calls for several accounts concurrently.
 
         Returns:
             Tuple of (created_count, updated_count, created_transaction_ids)
@@ -220,17 +295,44 @@ class SyncService:
         if not resolved_account_external_id:
             raise ValueError(f"Account {account.id} is missing provider external_id.")
 
-        transaction_data_list = adapter.fetch_transactions(
-            resolved_account_external_id,
-            start_date=start_date,
-            end_date=end_date,
-        )
+        if prefetched_transactions is not None:
+            transaction_data_list = prefetched_transactions
+        else:
+            transaction_data_list = adapter.fetch_transactions(
+                resolved_account_external_id,
+                start_date=start_date,
+                end_date=end_date,
+            )
 
         created_count = 0
         updated_count = 0
         created_transaction_ids: List[str] = []
         updated_transaction_ids: List[str] = []
 
+        # New rows are collected as plain column dicts and written with a
+        # single Core executemany INSERT at the end, bypassing ORM
+        # instantiation and unit-of-work tracking for the create path.
+        insert_rows: List[Dict[str, Any]] = []
+        pending_insert_eids: set = set()
+
+        # Prefetch all rows matching incoming external_ids in one query
+        # instead of one SELECT per transaction. Rows that acquire an
+        # external_id mid-loop (pending/CSV backfills, creates) are added
+        # to the map so duplicate payload entries still resolve.
+        external_ids = [
+            td.external_id for td in transaction_data_list if td.external_id
+        ]
+        existing_by_external_id: Dict[str, Transaction] = {}
+        if external_ids:
+            existing_by_external_id = {
+                txn.external_id: txn
+                for txn in self.db.query(Transaction).filter(
+                    Transaction.user_id == self.user_id,
+                    Transaction.account_id == account.id,
+                    Transaction.external_id.in_(external_ids),
+                )
+            }
+
         for transaction_data in transaction_data_list:
             # Try to auto-categorize the transaction
             category = self.category_matcher.match_category(
@@ -256,12 +358,34 @@ class SyncService:
                     account_id=str(account.id),
                 )
 
-            # Step 1: exact external_id match
-            existing_transaction = self.db.query(Transaction).filter(
-                Transaction.user_id == self.user_id,
-                Transaction.account_id == account.id,
-                Transaction.external_id == transaction_data.external_id,
-            ).first()
+            # Step 1: exact external_id match (from the prefetched map)
+            if transaction_data.external_id:
+                existing_transaction = existing_by_external_id.get(
+                    transaction_data.external_id
+                )
+                if (
+                    existing_transaction is None
+                    and transaction_data.external_id in pending_insert_eids
+                ):
+                    # Duplicate external_id within one payload: write out
+                    # the batched inserts so the row exists, then update
+                    # it through the ORM like any other existing row.
+                    self.db.execute(insert(Transaction), insert_rows)
+                    insert_rows.clear()
+                    pending_insert_eids.clear()
+                    existing_transaction = self.db.query(Transaction).filter(
+                        Transaction.user_id == self.user_id,
+                        Transaction.account_id == account.id,
+                        Transaction.external_id == transaction_data.external_id,
+                    ).first()
+                    existing_by_external_id[transaction_data.external_id] = existing_transaction
+            else:
+                self._write_null_eid_inserts(insert_rows, pending_insert_eids)
+                existing_transaction = self.db.query(Transaction).filter(
+                    Transaction.user_id == self.user_id,
+                    Transaction.account_id == account.id,
+                    Transaction.external_id.is_(None),
+                ).first()
 
             if existing_transaction:
                 # Update mutable fields; preserve any existing category
@@ -289,6 +413,11 @@ class SyncService:
                 updated_count += 1
                 continue
 
+            # Rows created earlier in this loop without an external_id are
+            # candidates for the IS NULL matchers below; write them out
+            # first, as the old per-row ORM flush used to guarantee.
+            self._write_null_eid_inserts(insert_rows, pending_insert_eids)
+
             # Step 2: pending → booked transition (only when incoming is not pending)
             if not transaction_data.pending:
                 pending_match = self._match_pending_transaction(
@@ -316,6 +445,8 @@ class SyncService:
                     if not pending_match.recurring_transaction_id and matched_subscription:
                         pending_match.recurring_transaction_id = matched_subscription.id
                     self.db.flush()
+                    if transaction_data.external_id:
+                        existing_by_external_id[transaction_data.external_id] = pending_match
                     updated_transaction_ids.append(str(pending_match.id))
                     updated_count += 1
                     _logger.info(
@@ -333,6 +464,8 @@ class SyncService:
             if csv_match:
                 csv_match.external_id = transaction_data.external_id
                 self.db.flush()
+                if transaction_data.external_id:
+                    existing_by_external_id[transaction_data.external_id] = csv_match
                 updated_transaction_ids.append(str(csv_match.id))
                 updated_count += 1
                 _logger.info(
@@ -341,30 +474,38 @@ class SyncService:
                 )
                 continue
 
-            # Step 4: create new
-            new_transaction = Transaction(
-                user_id=self.user_id,
-                account_id=account.id,
-                external_id=transaction_data.external_id,
-                transaction_type=transaction_data.transaction_type,
-                amount=transaction_data.amount,
-                currency=transaction_data.currency,
-                description=transaction_data.description,
-                merchant=merchant or transaction_data.merchant,
-                creditor=transaction_data.creditor,
-                debtor=transaction_data.debtor,
-                booked_at=transaction_data.booked_at,
-                pending=transaction_data.pending,
-                category_system_id=category.id if category else None,
-                recurring_transaction_id=matched_subscription.id if matched_subscription else None,
-                counterparty_iban_ciphertext=encrypt_value(transaction_data.counterparty_iban) if transaction_data.counterparty_iban else None,
-                counterparty_iban_hash=blind_index(transaction_data.counterparty_iban) if transaction_data.counterparty_iban else None,
-            )
-            self.db.add(new_transaction)
-            self.db.flush()
-            created_transaction_ids.append(str(new_transaction.id))
+            # Step 4: create new (as a plain column dict; id pre-generated
+            # so the caller gets its created ids without a flush)
+            row = {
+                "id": uuid4(),
+                "user_id": self.user_id,
+                "account_id": account.id,
+                "external_id": transaction_data.external_id,
+                "transaction_type": transaction_data.transaction_type,
+                "amount": transaction_data.amount,
+                "currency": transaction_data.currency,
+                "description": transaction_data.description,
+                "merchant": merchant or transaction_data.merchant,
+                "creditor": transaction_data.creditor,
+                "debtor": transaction_data.debtor,
+                "booked_at": transaction_data.booked_at,
+                "pending": transaction_data.pending,
+                "category_system_id": category.id if category else None,
+                "recurring_transaction_id": matched_subscription.id if matched_subscription else None,
+                "counterparty_iban_ciphertext": encrypt_value(transaction_data.counterparty_iban) if transaction_data.counterparty_iban else None,
+                "counterparty_iban_hash": blind_index(transaction_data.counterparty_iban) if transaction_data.counterparty_iban else None,
+            }
+            insert_rows.append(row)
+            if transaction_data.external_id:
+                pending_insert_eids.add(transaction_data.external_id)
+            created_transaction_ids.append(str(row["id"]))
             created_count += 1
 
+        # One write covers every remaining created row; large cold
+        # batches (initial history loads) stream through COPY.
+        if insert_rows:
+            self._write_insert_rows(insert_rows)
+
         # Post-sync cleanup: remove stale CSV duplicates for EB transactions already processed.
         # Build set of (amount, date) tuples from all EB transactions in this sync.
         eb_keys: set = set()
@@ -426,7 +567,8 @@ class SyncService:
                     orphan.id, orphan.amount, orphan_date,
                 )
 
-        self.db.commit()
+        with no_expire_on_commit(self.db):
+            self.db.commit()
 
         return (created_count, updated_count, created_transaction_ids, updated_transaction_ids)
     
@@ -464,16 +606,19 @@ class SyncService:
                     Account.external_id_hash.in_(blind_index_candidates("revolut_default")),
                 )
             ).all()
-            for old_account in old_default_accounts:
-                # Delete associated transactions first
+            if old_default_accounts:
+                old_ids = [old_account.id for old_account in old_default_accounts]
+                # Delete associated transactions first, then the accounts,
+                # in two bulk statements instead of two per account.
                 self.db.query(Transaction).filter(
                     Transaction.user_id == self.user_id,
-                    Transaction.account_id == old_account.id
-                ).delete()
-                # Then delete the account
-                self.db.delete(old_account)
-            if old_default_accounts:
-                self.db.commit()
+                    Transaction.account_id.in_(old_ids)
+                ).delete(synchronize_session=False)
+                self.db.query(Account).filter(
+                    Account.id.in_(old_ids)
+                ).delete(synchronize_session=False)
+                with no_expire_on_commit(self.db):
+                    self.db.commit()
 
         # Sync transactions for each account
         total_created = 0
@@ -495,22 +640,30 @@ class SyncService:
         # This ensures the balance is always accurate based on the transactions in the database
         from sqlalchemy import func
         from decimal import Decimal
-        for account in accounts:
-            # Calculate balance from sum of all transactions for this account
-            transaction_sum_result = self.db.query(func.sum(Transaction.amount)).filter(
-                Transaction.user_id == self.user_id,
-                Transaction.account_id == account.id
-            ).scalar()
-
-            if transaction_sum_result is None:
-                transaction_sum = Decimal("0")
-            else:
-                transaction_sum = Decimal(str(transaction_sum_result))
+        if accounts:
+            # One GROUP BY query covers every account instead of one
+            # SUM per account, and all balances commit together.
+            sums = dict(
+                self.db.query(
+                    Transaction.account_id,
+                    func.sum(Transaction.amount),
+                ).filter(
+                    Transaction.user_id == self.user_id,
+                    Transaction.account_id.in_([account.id for account in accounts]),
+                ).group_by(Transaction.account_id)
+            )
+            for account in accounts:
+                transaction_sum_result = sums.get(account.id)
+                if transaction_sum_result is None:
+                    transaction_sum = Decimal("0")
+                else:
+                    transaction_sum = Decimal(str(transaction_sum_result))
 
-            # Calculate functional_balance = sum(transactions) + starting_balance
-            starting_balance = account.starting_balance or Decimal("0")
-            account.functional_balance = transaction_sum + starting_balance
-            self.db.commit()
+                # Calculate functional_balance = sum(transactions) + starting_balance
+                starting_balance = account.starting_balance or Decimal("0")
+                account.functional_balance = transaction_sum + starting_balance
+            with no_expire_on_commit(self.db):
+                self.db.commit()
 
         # Detect subscription patterns from newly created transactions
         subscriptions_detected = 0
@@ -644,3 +797,140 @@ class SyncService:
                 'updated': False,
                 'transaction_id': str(new_transaction.id)
             }
+
+    def bulk_upsert_transactions(
+        self,
+        account_id: str,
+        transaction_data_list: List[TransactionData],
+    ) -> Dict[str, Any]:
+        """
+        Upsert many transactions for one account in a single statement.
+
+        Batch counterpart of upsert_transaction: the same categorization,
+        merchant extraction and subscription matching run per row, but
+        the writes collapse into one INSERT ... ON CONFLICT (account_id,
+        external_id) DO UPDATE, so N SELECT+INSERT/UPDATE round trips
+        become one. The preserve rules of the update path are expressed
+        in SQL: category/subscription links only fill when unset, and a
+        non-empty description is never overwritten by an empty one.
+        Postgres reports freshly-inserted rows via xmax = 0.
+
+        Does not commit; the caller owns the transaction boundary.
+
+        Args:
+            account_id: Account ID (UUID string)
+            transaction_data_list: Transaction data from bank adapter;
+                every entry must carry an external_id (the conflict key)
+
+        Returns:
+            Dict with keys: created, updated (counts),
+            created_ids, updated_ids (lists of str)
+        """
+        if not transaction_data_list:
+            return {'created': 0, 'updated': 0, 'created_ids': [], 'updated_ids': []}
+
+        account = self.db.query(Account).filter(
+            Account.id == account_id,
+            Account.user_id == self.user_id
+        ).first()
+
+        if not account:
+            raise ValueError(f"Account {account_id} not found for user {self.user_id}")
+
+        rows: List[Dict[str, Any]] = []
+        for transaction_data in transaction_data_list:
+            if not transaction_data.external_id:
+                raise ValueError(
+                    "bulk_upsert_transactions requires external_id on every "
+                    "transaction; use sync_transactions for provider data "
+                    "without stable ids."
+                )
+
+            category = self.category_matcher.match_category(
+                description=transaction_data.description,
+                merchant=transaction_data.merchant,
+                amount=transaction_data.amount,
+                transaction_type=transaction_data.transaction_type,
+                use_llm=self.use_llm_categorization
+            )
+
+            merchant = transaction_data.merchant
+            if not merchant and transaction_data.description:
+                merchant = extract_merchant(transaction_data.description)
+
+            matched_subscription = None
+            if float(transaction_data.amount) < 0:  # Only expenses
+                matched_subscription = self.subscription_matcher.match_transaction(
+                    description=transaction_data.description,
+                    merchant=merchant,
+                    amount=Decimal(str(transaction_data.amount)),
+                    account_id=str(account.id),
+                )
+
+            rows.append({
+                "id": uuid4(),
+                "user_id": self.user_id,
+                "account_id": account.id,
+                "external_id": transaction_data.external_id,
+                "transaction_type": transaction_data.transaction_type,
+                "amount": transaction_data.amount,
+                "currency": transaction_data.currency,
+                "description": transaction_data.description,
+                "merchant": merchant or transaction_data.merchant,
+                "creditor": transaction_data.creditor,
+                "debtor": transaction_data.debtor,
+                "booked_at": transaction_data.booked_at,
+                "pending": transaction_data.pending,
+                "category_system_id": category.id if category else None,
+                "recurring_transaction_id": matched_subscription.id if matched_subscription else None,
+                "counterparty_iban_ciphertext": encrypt_value(transaction_data.counterparty_iban) if transaction_data.counterparty_iban else None,
+                "counterparty_iban_hash": blind_index(transaction_data.counterparty_iban) if transaction_data.counterparty_iban else None,
+            })
+
+        stmt = pg_insert(Transaction).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["account_id", "external_id"],
+            set_={
+                "amount": stmt.excluded.amount,
+                "currency": stmt.excluded.currency,
+                # Don't overwrite a non-empty description with an empty one
+                "description": func.coalesce(
+                    func.nullif(stmt.excluded.description, ''),
+                    Transaction.description,
+                ),
+                "merchant": stmt.excluded.merchant,
+                "creditor": stmt.excluded.creditor,
+                "debtor": stmt.excluded.debtor,
+                "booked_at": stmt.excluded.booked_at,
+                "transaction_type": stmt.excluded.transaction_type,
+                "pending": stmt.excluded.pending,
+                "counterparty_iban_ciphertext": stmt.excluded.counterparty_iban_ciphertext,
+                "counterparty_iban_hash": stmt.excluded.counterparty_iban_hash,
+                # Preserve user overrides and existing AI/subscription links
+                "category_system_id": func.coalesce(
+                    Transaction.category_system_id,
+                    stmt.excluded.category_system_id,
+                ),
+                "recurring_transaction_id": func.coalesce(
+                    Transaction.recurring_transaction_id,
+                    stmt.excluded.recurring_transaction_id,
+                ),
+                "updated_at": datetime.utcnow(),
+            },
+        ).returning(
+            Transaction.id,
+            # xmax = 0 only for rows this statement freshly inserted
+            literal_column("(xmax = 0)").label("created"),
+        )
+
+        created_ids: List[str] = []
+        updated_ids: List[str] = []
+        for row_id, created in self.db.execute(stmt):
+            (created_ids if created else updated_ids).append(str(row_id))
+
+        return {
+            'created': len(created_ids),
+            'updated': len(updated_ids),
+            'created_ids': created_ids,
+            'updated_ids': updated_ids,
+        }
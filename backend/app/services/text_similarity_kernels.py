@@ -0,0 +1,59 @@
+"""
+Numba-compiled kernels for text similarity scoring.
+
+The edit-distance fallback in TextSimilarity is a classical dynamic
+program over two byte buffers - exactly the shape numba compiles to
+near-C loops. The kernel is only used when numba is installed; callers
+must check ``indel_ratio_u8 is not None`` and keep their pure-Python
+fallback, mirroring the optional-kernel pattern in
+subscription_detector.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba is an optional accelerator
+    njit = None
+
+
+def _indel_ratio_u8(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Normalized indel similarity of two uint8 buffers (0.0-1.0).
+
+    Two-row DP over insert/delete edits (no substitutions), i.e. the
+    same measure rapidfuzz's ``fuzz.ratio`` computes:
+    ``1 - distance / (len(a) + len(b))``.
+    """
+    la = a.size
+    lb = b.size
+    if la == 0 or lb == 0:
+        return 1.0 if la == lb else 0.0
+    prev = np.empty(lb + 1, dtype=np.int64)
+    curr = np.empty(lb + 1, dtype=np.int64)
+    for j in range(lb + 1):
+        prev[j] = j
+    for i in range(1, la + 1):
+        curr[0] = i
+        ai = a[i - 1]
+        for j in range(1, lb + 1):
+            if ai == b[j - 1]:
+                curr[j] = prev[j - 1]
+            else:
+                dele = prev[j]
+                ins = curr[j - 1]
+                curr[j] = (dele if dele < ins else ins) + 1
+        prev, curr = curr, prev
+    return 1.0 - prev[lb] / (la + lb)
+
+
+if njit is not None:
+    indel_ratio_u8 = njit(cache=True)(_indel_ratio_u8)
+    # Warm the kernel so the first matching run doesn't pay JIT cost.
+    indel_ratio_u8(
+        np.frombuffer(b'netflix', dtype=np.uint8),
+        np.frombuffer(b'netflix bv', dtype=np.uint8),
+    )
+else:
+    # The pure-Python DP is far slower than difflib's C helpers, so
+    # without numba the kernel is not offered at all.
+    indel_ratio_u8 = None
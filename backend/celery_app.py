@@ -4,6 +4,7 @@ Celery application configuration for scheduled tasks.
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init
 
 # Redis URL for broker and backend
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -121,5 +122,19 @@ celery_app.conf.update(
 celery_app.autodiscover_tasks(["tasks"])
 
 
+@worker_process_init.connect
+def _reset_engine_pool(**kwargs):
+    """
+    Dispose the SQLAlchemy pool in each forked worker process.
+
+    Pooled sockets inherited from the parent would otherwise be shared
+    across forks, corrupting the Postgres protocol stream. dispose()
+    makes each child lazily open its own connections.
+    """
+    from app.database import engine
+
+    engine.dispose()
+
+
 if __name__ == "__main__":
     celery_app.start()
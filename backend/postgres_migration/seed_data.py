@@ -22,6 +22,7 @@ if str(backend_dir) not in sys.path:
 import random
 from datetime import datetime, timedelta, date
 from decimal import Decimal
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.database import engine, SessionLocal, Base
@@ -72,13 +73,9 @@ def create_accounts(db: Session, user_id: str) -> list[Account]:
         ),
     ]
 
-    for account in accounts:
-        db.add(account)
+    db.add_all(accounts)
     db.commit()
 
-    for account in accounts:
-        db.refresh(account)
-
     return accounts
 
 
@@ -112,9 +109,6 @@ def create_categories(db: Session, user_id: str) -> list[Category]:
 
     db.commit()
 
-    for category in categories:
-        db.refresh(category)
-
     return categories
 
 
@@ -222,7 +216,7 @@ def create_transactions(db: Session, accounts: list[Account], categories: list[C
                 category = None
 
             category_id_value = category.id if category else None
-            transaction = Transaction(
+            transaction = dict(
                 user_id=user_id,
                 account_id=account.id,
                 transaction_type="debit",
@@ -246,7 +240,7 @@ def create_transactions(db: Session, accounts: list[Account], categories: list[C
             salary_cat = next((c for c in income_categories if c.name == "Salary"), None)
             salary_category_id = salary_cat.id if salary_cat else None
             transactions.append(
-                Transaction(
+                dict(
                     user_id=user_id,
                     account_id=checking_eur.id,
                     transaction_type="credit",
@@ -267,7 +261,7 @@ def create_transactions(db: Session, accounts: list[Account], categories: list[C
         freelance_cat = next((c for c in income_categories if c.name == "Freelance"), None)
         freelance_category_id = freelance_cat.id if freelance_cat else None
         transactions.append(
-            Transaction(
+            dict(
                 user_id=user_id,
                 account_id=checking_usd.id,
                 transaction_type="credit",
@@ -291,7 +285,7 @@ def create_transactions(db: Session, accounts: list[Account], categories: list[C
         freelance_cat = next((c for c in income_categories if c.name == "Freelance"), None)
         freelance_category_id = freelance_cat.id if freelance_cat else None
         transactions.append(
-            Transaction(
+            dict(
                 user_id=user_id,
                 account_id=checking_eur.id,
                 transaction_type="credit",
@@ -315,7 +309,7 @@ def create_transactions(db: Session, accounts: list[Account], categories: list[C
         freelance_cat = next((c for c in income_categories if c.name == "Freelance"), None)
         freelance_category_id = freelance_cat.id if freelance_cat else None
         transactions.append(
-            Transaction(
+            dict(
                 user_id=user_id,
                 account_id=checking_gbp.id,
                 transaction_type="credit",
@@ -332,9 +326,10 @@ def create_transactions(db: Session, accounts: list[Account], categories: list[C
             )
         )
 
-    # Add all transactions
-    for txn in transactions:
-        db.add(txn)
+    # Insert all transactions in one multi-row INSERT instead of one
+    # ORM flush per row; missing columns (id, created_at, ...) still get
+    # their Column defaults under the Core insert.
+    db.execute(insert(Transaction), transactions)
 
     db.commit()
     print(f"Created {len(transactions)} transactions")
@@ -393,6 +388,10 @@ def clear_data(db: Session, user_id: str) -> None:
 
 def seed():
     db = SessionLocal()
+    # Keep attributes populated across the intermediate commits: ids are
+    # assigned client-side at flush (Column default uuid4), so neither a
+    # per-row refresh nor an expired-attribute SELECT is needed.
+    db.expire_on_commit = False
     try:
         # Get or create system user
         print("Setting up system user...")
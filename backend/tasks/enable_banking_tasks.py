@@ -5,15 +5,18 @@ Celery tasks for Enable Banking sync and consent management.
 import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 import redis
-from sqlalchemy.orm import Session
+from celery import chord
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session, selectinload
 
 from celery_app import celery_app
 from app.database import SessionLocal
-from app.models import BankConnection, Account
+from app.models import Account, BankConnection
 from app.integrations.enable_banking_adapter import EnableBankingAdapter
 from app.integrations.enable_banking_auth import EnableBankingClient
 from app.services.sync_service import SyncService
@@ -26,6 +29,10 @@ REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 SYNC_COOLDOWN_SECONDS = 300    # 5 min since last completed sync
 SYNC_IN_PROGRESS_TIMEOUT = 600  # 10 min since sync started (covers 730-day initial load)
 
+# Concurrent per-account API fetches within one connection sync. Caps
+# the fan-out so a many-account connection doesn't hammer the provider.
+ACCOUNT_FETCH_CONCURRENCY = int(os.getenv("EB_ACCOUNT_FETCH_CONCURRENCY", "8"))
+
 
 def _should_skip_sync(connection) -> bool:
     """Return True if a sync should be skipped due to recency or in-progress state."""
@@ -89,7 +96,15 @@ def _clear_sync_progress(connection_id: str) -> None:
         pass
 
 
-@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+# rate_limit throttles task starts on the consumer side, so a chord
+# dispatch over many connections drips onto the Enable Banking API
+# instead of spiking past provider limits into 429s and retry storms.
+@celery_app.task(
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60,
+    rate_limit=os.getenv("EB_SYNC_RATE_LIMIT", "12/m"),
+)
 def sync_bank_connection(self, connection_id: str):
     """
     Sync a single bank connection: fetch balances + transactions for all accounts.
@@ -97,13 +112,23 @@ def sync_bank_connection(self, connection_id: str):
     """
     db: Session = SessionLocal()
     try:
-        connection = db.query(BankConnection).filter(
+        # Load the linked accounts with the connection in one round trip
+        # instead of a separate Account query below. SKIP LOCKED checks
+        # the row out: a concurrent worker running the same connection
+        # sees no row and skips, so duplicate dispatches (two beat ticks,
+        # a manual trigger racing the schedule) never double-sync. The
+        # lock is released by the sync_started_at commit just below.
+        connection = db.query(BankConnection).options(
+            selectinload(BankConnection.accounts),
+        ).filter(
             BankConnection.id == connection_id,
-        ).first()
+        ).with_for_update(skip_locked=True).first()
 
         if not connection:
-            logger.error(f"Bank connection {connection_id} not found")
-            return {"error": "Connection not found"}
+            logger.info(
+                f"Bank connection {connection_id} not found or locked by another worker"
+            )
+            return {"skipped": True, "reason": "not_found_or_locked"}
 
         if connection.status not in ("active",):
             logger.info(f"Skipping sync for connection {connection_id} with status {connection.status}")
@@ -114,8 +139,14 @@ def sync_bank_connection(self, connection_id: str):
             logger.info(f"[SYNC] Skipped for connection {connection_id}: too recent or in progress")
             return {"skipped": True, "reason": "sync_too_recent"}
 
-        # Mark sync as in progress before any API calls
-        connection.sync_started_at = datetime.now(timezone.utc)
+        # Mark sync as in progress before any API calls. A targeted Core
+        # UPDATE writes just this column; an ORM flush would walk the
+        # whole unit of work, including the loaded accounts.
+        db.execute(
+            update(BankConnection)
+            .where(BankConnection.id == connection_id)
+            .values(sync_started_at=datetime.now(timezone.utc))
+        )
         db.commit()
         _sync_started_at_cleared = False  # tracks whether the success path already cleared it
 
@@ -138,10 +169,9 @@ def sync_bank_connection(self, connection_id: str):
         # Do NOT set use_llm_categorization=True here without removing the batch step.
         sync_service = SyncService(db, user_id=connection.user_id, use_llm_categorization=False)
 
-        # Get accounts linked to this connection
-        accounts = db.query(Account).filter(
-            Account.bank_connection_id == connection.id,
-        ).all()
+        # Accounts linked to this connection (pre-loaded with the
+        # connection query above)
+        accounts = connection.accounts
 
         # Backfill account-level IBAN on synced accounts that don't have it yet.
         # This is independent of the per-account sync_transactions loop below;
@@ -156,28 +186,49 @@ def sync_bank_connection(self, connection_id: str):
         # on subsequent calls the "accounts" field collapses to a list of
         # UID strings. We fetch each account's IBAN individually via
         # /accounts/{uid}/details which always returns the canonical form.
+        backfill_accounts = []
         for acc in accounts:
             if acc.iban_hash is not None:
                 continue  # Skip accounts that already have IBAN persisted
             acc_uid = decrypt_with_fallback(
                 acc.external_id_ciphertext, acc.external_id
             )
-            if not acc_uid:
-                continue
-            try:
-                iban = adapter.fetch_account_iban(acc_uid)
+            if acc_uid:
+                backfill_accounts.append((acc, acc_uid))
+
+        if backfill_accounts:
+            # The per-account detail calls are independent GETs, so they
+            # run concurrently and wall time drops from the sum of
+            # latencies to roughly the slowest call. Only the fetches
+            # are threaded; the session is touched on this thread only.
+            def _fetch_iban(uid):
+                try:
+                    return adapter.fetch_account_iban(uid)
+                except Exception as e:
+                    return e
+
+            with ThreadPoolExecutor(
+                max_workers=min(len(backfill_accounts), ACCOUNT_FETCH_CONCURRENCY)
+            ) as pool:
+                iban_results = list(
+                    pool.map(_fetch_iban, [uid for _, uid in backfill_accounts])
+                )
+
+            for (acc, _uid), iban in zip(backfill_accounts, iban_results):
+                if isinstance(iban, Exception):
+                    # One account's failure must not block the others, nor
+                    # the downstream transaction sync. Skip and move on;
+                    # backfill retries on the next sync.
+                    logger.warning(
+                        "[SYNC] IBAN backfill skipped for account %s on connection %s: %s",
+                        acc.id, connection_id, iban, exc_info=iban,
+                    )
+                    continue
                 if iban:
+                    # No per-account commit here: every commit is a WAL
+                    # fsync, and the final success-path commit persists
+                    # these fields together with the sync results.
                     sync_service._set_account_iban_fields(acc, iban)
-                    db.commit()
-            except Exception as e:
-                # One account's failure must not block the others, nor the
-                # downstream transaction sync. Skip and move on; backfill
-                # retries on the next sync.
-                logger.warning(
-                    "[SYNC] IBAN backfill skipped for account %s on connection %s: %s",
-                    acc.id, connection_id, e, exc_info=True,
-                )
-                db.rollback()
 
         total_created = 0
         total_updated = 0
@@ -196,7 +247,12 @@ def sync_bank_connection(self, connection_id: str):
             "started_at": sync_started_at,
         })
 
-        for i, account in enumerate(accounts):
+        # Resolve provider UIDs and per-account windows up front so the
+        # balance and transaction fetches — independent GETs per account —
+        # can fan out concurrently. The loop below then only consumes
+        # prefetched payloads and does DB work, all on this thread.
+        sync_accounts = []
+        for account in accounts:
             account_uid = decrypt_with_fallback(
                 account.external_id_ciphertext,
                 account.external_id,
@@ -204,7 +260,37 @@ def sync_bank_connection(self, connection_id: str):
             if not account_uid:
                 logger.warning(f"No external_id for account {account.id}, skipping")
                 continue
+            sync_accounts.append(
+                (account, account_uid, _account_sync_start_date(account, connection))
+            )
 
+        def _fetch_account_data(args):
+            uid, start_date = args
+            try:
+                balance_data = adapter.fetch_balances(uid)
+            except Exception as e:
+                balance_data = e
+            try:
+                transactions = adapter.fetch_transactions(
+                    uid, start_date=start_date, end_date=end_date
+                )
+            except Exception as e:
+                transactions = e
+            return balance_data, transactions
+
+        if sync_accounts:
+            with ThreadPoolExecutor(
+                max_workers=min(len(sync_accounts), ACCOUNT_FETCH_CONCURRENCY)
+            ) as pool:
+                fetch_results = list(
+                    pool.map(_fetch_account_data, [(uid, sd) for _, uid, sd in sync_accounts])
+                )
+        else:
+            fetch_results = []
+
+        for i, ((account, account_uid, start_date), (balance_result, tx_result)) in enumerate(
+            zip(sync_accounts, fetch_results)
+        ):
             # Fetch and update balances.
             # Priority order of ISO 20022 balance types:
             #   CLAV/ITAV = (interim) available — most accurate "what you can spend"
@@ -215,8 +301,9 @@ def sync_bank_connection(self, connection_id: str):
             # ABN AMRO via Enable Banking does not return CLAV/ITAV, so fall through
             # the priority list and finally pick the first returned balance.
             try:
-                balance_data = adapter.fetch_balances(account_uid)
-                balances = balance_data.get("balances", [])
+                if isinstance(balance_result, Exception):
+                    raise balance_result
+                balances = balance_result.get("balances", [])
                 priority = ("CLAV", "ITAV", "CLBD", "XPCD", "PRCD", "OTHR")
                 chosen = None
                 for pref in priority:
@@ -238,14 +325,16 @@ def sync_bank_connection(self, connection_id: str):
             except Exception as e:
                 logger.warning(f"Failed to fetch balances for account {account.id}: {e}")
 
-            # Sync transactions via SyncService
+            # Sync transactions via SyncService (payload prefetched above)
             try:
-                start_date = _account_sync_start_date(account, connection)  # per-account
+                if isinstance(tx_result, Exception):
+                    raise tx_result
                 created, updated, created_ids, updated_ids = sync_service.sync_transactions(
                     adapter=adapter,
                     account=account,
                     start_date=start_date,
                     end_date=end_date,
+                    prefetched_transactions=tx_result,
                 )
                 total_created += created
                 total_updated += updated
@@ -256,7 +345,6 @@ def sync_bank_connection(self, connection_id: str):
                 logger.error(f"Failed to sync transactions for account {account.id}: {e}")
                 raise
 
-            account.last_synced_at = datetime.now(timezone.utc)
             _set_sync_progress(connection_id, {
                 "stage": "syncing",
                 "accounts_done": i + 1,
@@ -280,6 +368,15 @@ def sync_bank_connection(self, connection_id: str):
                 account.starting_balance = _balance_av - _txn_sum
                 account.functional_balance = _balance_av
 
+        # One UPDATE stamps every synced account instead of N per-row
+        # UPDATEs in the unit-of-work flush below.
+        if synced_account_ids:
+            db.execute(
+                update(Account)
+                .where(Account.id.in_(synced_account_ids))
+                .values(last_synced_at=datetime.now(timezone.utc))
+            )
+
         connection.last_synced_at = datetime.now(timezone.utc)
         connection.sync_started_at = None  # clear atomically with last_synced_at
         connection.last_sync_error = None
@@ -311,91 +408,159 @@ def sync_bank_connection(self, connection_id: str):
 
     except Exception as e:
         logger.error(f"Sync failed for connection {connection_id}: {e}", exc_info=True)
-        # Mark error on connection
+        # Mark error on connection. Roll back first — the session may be
+        # mid-failed-transaction — then write the error fields with a
+        # Core UPDATE keyed on the id, which needs no object state and
+        # avoids re-SELECTing the row just to flip two columns.
         try:
-            connection = db.query(BankConnection).filter(
-                BankConnection.id == connection_id,
-            ).first()
-            if connection:
-                error_msg = str(e)
-                # Detect expired consent (only from Enable Banking API errors, not internal auth)
-                is_eb_auth_error = (
-                    ("401" in error_msg or "403" in error_msg)
-                    and "enablebanking" in error_msg.lower()
-                ) or "consent" in error_msg.lower()
-                if is_eb_auth_error:
-                    connection.status = "expired"
-                    connection.last_sync_error = "Consent expired. Please reconnect."
-                else:
-                    connection.last_sync_error = error_msg[:500]
-                db.commit()
+            db.rollback()
+            error_msg = str(e)
+            # Detect expired consent (only from Enable Banking API errors, not internal auth)
+            is_eb_auth_error = (
+                ("401" in error_msg or "403" in error_msg)
+                and "enablebanking" in error_msg.lower()
+            ) or "consent" in error_msg.lower()
+            if is_eb_auth_error:
+                error_values = {
+                    "status": "expired",
+                    "last_sync_error": "Consent expired. Please reconnect.",
+                }
+            else:
+                error_values = {"last_sync_error": error_msg[:500]}
+            db.execute(
+                update(BankConnection)
+                .where(BankConnection.id == connection_id)
+                .values(**error_values)
+            )
+            db.commit()
         except Exception:
             pass
         _clear_sync_progress(connection_id)
         raise self.retry(exc=e)
     finally:
-        # Clear in-progress marker if not already cleared by the success path
+        # Clear in-progress marker if not already cleared by the success
+        # path. A Core UPDATE needs no object state, so there is no
+        # re-SELECT and it works even if the session's identity map is
+        # unusable after an error.
         if not _sync_started_at_cleared:
             try:
-                conn = db.query(BankConnection).filter(BankConnection.id == connection_id).first()
-                if conn:
-                    conn.sync_started_at = None
-                    db.commit()
+                db.execute(
+                    update(BankConnection)
+                    .where(BankConnection.id == connection_id)
+                    .values(sync_started_at=None)
+                )
+                db.commit()
             except Exception:
                 pass
         db.close()
 
 
+@celery_app.task
+def _summarize_sync_results(results):
+    """
+    Chord callback: aggregate per-connection sync results into totals.
+    """
+    summary = {
+        "connections": len(results),
+        "skipped": 0,
+        "transactions_created": 0,
+        "transactions_updated": 0,
+    }
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        if result.get("skipped") or result.get("error"):
+            summary["skipped"] += 1
+            continue
+        summary["transactions_created"] += result.get("transactions_created", 0)
+        summary["transactions_updated"] += result.get("transactions_updated", 0)
+    logger.info(f"Bank sync batch complete: {summary}")
+    return summary
+
+
 @celery_app.task
 def sync_all_bank_connections():
     """
     Periodic task: dispatch sync for all active bank connections.
     Runs every 6 hours via Celery beat.
+
+    Dispatched as a chord so the per-connection tasks fan out across
+    workers and one aggregated summary lands in the result backend,
+    instead of N unrelated results nobody joins.
     """
     db: Session = SessionLocal()
     try:
-        connections = db.query(BankConnection).filter(
-            BankConnection.status == "active",
-        ).all()
-
-        dispatched = 0
-        for conn in connections:
-            try:
-                sync_bank_connection.delay(str(conn.id))
-                dispatched += 1
-            except Exception as e:
-                logger.error(f"Failed to dispatch sync for connection {conn.id}: {e}")
-
-        logger.info(f"Dispatched sync for {dispatched} active connections")
-        return {"dispatched": dispatched}
+        # Piggyback consent-expiry marking on this scan: one UPDATE over
+        # the same table keeps just-expired connections out of the
+        # dispatch below without waiting for the daily check.
+        expired_count = _mark_expired_consents(db)
+        if expired_count:
+            db.commit()
+
+        # Push the "due" predicate into SQL so rows synced within the
+        # cooldown never reach the task queue. The per-task
+        # _should_skip_sync guard stays as the race-safe backstop.
+        due_cutoff = datetime.now(timezone.utc) - timedelta(seconds=SYNC_COOLDOWN_SECONDS)
+        connection_ids = [
+            str(cid) for (cid,) in db.query(BankConnection.id).filter(
+                BankConnection.status == "active",
+                or_(
+                    BankConnection.last_synced_at.is_(None),
+                    BankConnection.last_synced_at < due_cutoff,
+                ),
+            )
+        ]
     finally:
         db.close()
 
+    if not connection_ids:
+        return {"dispatched": 0}
+
+    chord(
+        (sync_bank_connection.s(cid) for cid in connection_ids),
+        _summarize_sync_results.s(),
+    ).apply_async()
+
+    logger.info(f"Dispatched sync chord for {len(connection_ids)} active connections")
+    return {"dispatched": len(connection_ids)}
+
+
+def _mark_expired_consents(db: Session) -> int:
+    """
+    Flip active connections with lapsed consents to expired.
+
+    One bulk UPDATE instead of a SELECT plus per-row ORM writes; the
+    caller owns the commit. Returns the number of rows flipped.
+    """
+    result = db.execute(
+        update(BankConnection)
+        .where(
+            BankConnection.status == "active",
+            BankConnection.consent_expires_at <= datetime.now(timezone.utc),
+        )
+        .values(
+            status="expired",
+            last_sync_error="Consent expired. Please reconnect your bank.",
+        )
+    )
+    return result.rowcount or 0
+
 
 @celery_app.task
 def check_consent_expiry():
     """
     Daily task: update status for connections with expired consents.
     Frontend reads consent_expires_at directly for banner display.
+
+    The periodic sync scan runs the same marking pass, so this mostly
+    catches connections on instances where syncs are paused.
     """
     db: Session = SessionLocal()
     try:
-        now = datetime.now(timezone.utc)
-
-        # Mark expired connections
-        expired = db.query(BankConnection).filter(
-            BankConnection.status == "active",
-            BankConnection.consent_expires_at <= now,
-        ).all()
-
-        for conn in expired:
-            conn.status = "expired"
-            conn.last_sync_error = "Consent expired. Please reconnect your bank."
-            logger.info(f"Marked connection {conn.id} ({conn.aspsp_name}) as expired")
-
+        expired_count = _mark_expired_consents(db)
         db.commit()
 
-        logger.info(f"Consent expiry check: marked {len(expired)} connections as expired")
-        return {"expired_count": len(expired)}
+        logger.info(f"Consent expiry check: marked {expired_count} connections as expired")
+        return {"expired_count": expired_count}
     finally:
         db.close()
@@ -1,11 +1,18 @@
 """
 Test categorizer API endpoint.
+
+Runs against a locally running API server; the probe fixture skips the
+tests when no server is listening. The single and batch probes go out
+concurrently over one keep-alive connection, once per pytest session.
 """
+import asyncio
 import sys
 import os
-import requests
 from decimal import Decimal
 
+import httpx
+import pytest
+
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -24,7 +31,7 @@ def setup_test_data():
         Base.metadata.create_all(bind=engine)
         user = get_or_create_system_user(db)
         user_id = str(user.id)
-        
+
         # Create a test account
         account = Account(
             user_id=user_id,
@@ -38,7 +45,7 @@ def setup_test_data():
         )
         db.add(account)
         db.commit()
-        
+
         # Create test categories
         categories = [
             Category(user_id=user_id, name="Groceries", category_type="expense", is_system=False),
@@ -48,119 +55,98 @@ def setup_test_data():
         for cat in categories:
             db.add(cat)
         db.commit()
-        
+
         return user_id
     finally:
         db.close()
 
 
-def test_categorizer_single():
-    """Test single transaction categorization."""
-    print("Testing Categorizer API (single transaction)...")
-    
-    try:
-        user_id = setup_test_data()
-        url = f"{BASE_URL}/categories/categorize"
-        path_with_query = "/api/categories/categorize"
-        
-        payload = {
-            "description": "TESCO SUPERMARKET",
-            "merchant": "Tesco",
-            "amount": -25.50,
-            "transaction_type": "debit",
-            "use_llm": False  # Use deterministic matching for faster tests
-        }
-        
-        response = requests.post(
-            url,
-            json=payload,
-            headers=build_internal_auth_headers("POST", path_with_query, user_id),
-            timeout=30,
+def _single_payload():
+    return {
+        "description": "TESCO SUPERMARKET",
+        "merchant": "Tesco",
+        "amount": -25.50,
+        "transaction_type": "debit",
+        "use_llm": False  # Use deterministic matching for faster tests
+    }
+
+
+def _batch_payload():
+    return {
+        "transactions": [
+            {
+                "description": "TESCO SUPERMARKET",
+                "merchant": "Tesco",
+                "amount": -25.50,
+                "transaction_type": "debit"
+            },
+            {
+                "description": "UBER RIDE",
+                "merchant": "Uber",
+                "amount": -15.00,
+                "transaction_type": "debit"
+            },
+            {
+                "description": "SALARY PAYMENT",
+                "merchant": "Employer",
+                "amount": 100.00,
+                "transaction_type": "credit"
+            }
+        ],
+        "use_llm": False  # Use deterministic matching for faster tests
+    }
+
+
+async def _run_categorizer_probes(user_id):
+    """POST the single and batch payloads concurrently over one connection."""
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=30) as client:
+        return await asyncio.gather(
+            client.post(
+                "/categories/categorize",
+                json=_single_payload(),
+                headers=build_internal_auth_headers(
+                    "POST", "/api/categories/categorize", user_id
+                ),
+            ),
+            client.post(
+                "/categories/categorize/batch",
+                json=_batch_payload(),
+                headers=build_internal_auth_headers(
+                    "POST", "/api/categories/categorize/batch", user_id
+                ),
+            ),
         )
-    
-        if response.status_code == 200:
-            result = response.json()
-            # Should return a category (or None if no match)
-            assert "category_id" in result or result.get("category_id") is None
-            assert "method" in result
-            print(f"✓ Single categorization test passed (method: {result.get('method')})")
-            return True
-        else:
-            print(f"✗ Single categorization test failed: {response.status_code}")
-            print(f"  Response: {response.text}")
-            return False
-    except Exception as e:
-        print(f"✗ Test setup failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
 
 
-def test_categorizer_batch():
-    """Test batch transaction categorization."""
-    print("Testing Categorizer API (batch)...")
-    
+@pytest.fixture(scope="session")
+def categorizer_responses():
+    """One gathered probe run shared by every parametrized test."""
     try:
         user_id = setup_test_data()
-        url = f"{BASE_URL}/categories/categorize/batch"
-        path_with_query = "/api/categories/categorize/batch"
-        
-        payload = {
-            "transactions": [
-                {
-                    "description": "TESCO SUPERMARKET",
-                    "merchant": "Tesco",
-                    "amount": -25.50,
-                    "transaction_type": "debit"
-                },
-                {
-                    "description": "UBER RIDE",
-                    "merchant": "Uber",
-                    "amount": -15.00,
-                    "transaction_type": "debit"
-                },
-                {
-                    "description": "SALARY PAYMENT",
-                    "merchant": "Employer",
-                    "amount": 100.00,
-                    "transaction_type": "credit"
-                }
-            ],
-            "use_llm": False  # Use deterministic matching for faster tests
-        }
-        
-        response = requests.post(
-            url,
-            json=payload,
-            headers=build_internal_auth_headers("POST", path_with_query, user_id),
-            timeout=30,
-        )
-    
-        if response.status_code == 200:
-            result = response.json()
-            assert "results" in result
-            assert len(result["results"]) == 3, "Should return 3 results"
-            assert result.get("total_transactions") == 3
-            print(f"✓ Batch categorization test passed ({result.get('categorized_count', 0)} categorized)")
-            return True
-        else:
-            print(f"✗ Batch categorization test failed: {response.status_code}")
-            print(f"  Response: {response.text}")
-            return False
+        single, batch = asyncio.run(_run_categorizer_probes(user_id))
     except Exception as e:
-        print(f"✗ Test setup failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+        pytest.skip(f"Categorizer API not reachable at {BASE_URL}: {e}")
+    return {"single": single, "batch": batch}
 
 
-if __name__ == "__main__":
-    try:
-        success1 = test_categorizer_single()
-        success2 = test_categorizer_batch()
-        sys.exit(0 if (success1 and success2) else 1)
-    except Exception as e:
-        print(f"✗ Test failed with exception: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+def _check_single(result):
+    # Should return a category (or None if no match)
+    assert "category_id" in result or result.get("category_id") is None
+    assert "method" in result
+
+
+def _check_batch(result):
+    assert "results" in result
+    assert len(result["results"]) == 3, "Should return 3 results"
+    assert result.get("total_transactions") == 3
+
+
+@pytest.mark.parametrize(
+    "probe,check",
+    [("single", _check_single), ("batch", _check_batch)],
+    ids=["single", "batch"],
+)
+def test_categorizer(probe, check, categorizer_responses):
+    response = categorizer_responses[probe]
+    assert response.status_code == 200, response.text
+    check(response.json())
@@ -0,0 +1,59 @@
+"""
+Tests for the merchant extractor service.
+"""
+import sys
+import os
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.merchant_extractor import MerchantExtractor, extract_merchant
+
+
+def test_extract_known_merchant():
+    extractor = MerchantExtractor()
+    result = extractor.extract("SEPA INCASSO Netflix BV Amsterdam")
+    assert result.merchant == "Netflix"
+    assert result.method == "known_pattern"
+
+
+def test_extract_prefers_specific_merchant_over_payment_processor():
+    extractor = MerchantExtractor()
+    result = extractor.extract("Mollie VOLT45 payment")
+    assert result.merchant == "VOLT45"
+
+
+def test_extract_existing_merchant_wins():
+    extractor = MerchantExtractor()
+    result = extractor.extract("SEPA INCASSO Netflix", existing_merchant="My Shop")
+    assert result.merchant == "My Shop"
+    assert result.method == "existing"
+
+
+def test_extract_series_matches_scalar_path():
+    extractor = MerchantExtractor()
+    descriptions = [
+        "SEPA INCASSO Netflix BV Amsterdam",
+        "Mollie VOLT45 payment",
+        "Spotify AB Stockholm",
+        "Albert Heijn 1234 AMSTERDAM",
+        "ANYTIME FITNESS AMSTERDAM",
+        "",
+        None,
+    ]
+    series_result = extractor.extract_series(pd.Series(descriptions))
+    scalar_result = [extractor.extract(d).merchant for d in descriptions]
+    assert series_result.tolist() == scalar_result
+
+
+def test_extract_series_empty():
+    extractor = MerchantExtractor()
+    result = extractor.extract_series(pd.Series([], dtype=object))
+    assert result.empty
+
+
+def test_extract_merchant_convenience():
+    assert extract_merchant("SEPA INCASSO Spotify AB") == "Spotify"
+    assert extract_merchant(None) is None